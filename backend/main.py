@@ -4,8 +4,11 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import asyncpg
-from src.poker_game.api.hands import router as hands_router, init_db_pool, close_db_pool
+from src.poker_game.api.hands import router as hands_router, init_db_pool, close_db_pool, get_db_pools
+from src.poker_game.api.debug import PROFILE_ID_HEADER, router as debug_router, profiling_middleware
+from src.poker_game.api.jobs import router as jobs_router, start_job_workers, stop_job_workers
 from src.poker_game.db_init import init_db
+from src.poker_game.profiling import PROFILING_ENABLED
 
 sys.path.insert(0, str(Path(__file__).parent))
 
@@ -39,10 +42,18 @@ async def lifespan(app: FastAPI):
             print(f"Schema for hands table: {schema}")
         await pool.close()
 
+        await start_job_workers(await get_db_pools())
+        print("Job workers started")
+
     except Exception as e:
         print(f"Failed to initialize database: {str(e)}")
         raise
     yield
+    try:
+        await stop_job_workers()
+        print("Job workers stopped")
+    except Exception as e:
+        print(f"Failed to stop job workers: {str(e)}")
     try:
         await close_db_pool()
         print("Database pool closed successfully")
@@ -51,15 +62,24 @@ async def lifespan(app: FastAPI):
 
 app = FastAPI(lifespan=lifespan)
 
+# Request profiling is opt-in; without PROFILING_ENABLED neither the middleware nor the
+# profile download endpoint is installed
+if PROFILING_ENABLED:
+    app.middleware("http")(profiling_middleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000", "http://localhost:3001"],
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[PROFILE_ID_HEADER],
 )
 
 app.include_router(hands_router)
+app.include_router(jobs_router)
+if PROFILING_ENABLED:
+    app.include_router(debug_router)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1 @@
+ALTER TABLE hands ADD COLUMN IF NOT EXISTS variant TEXT NOT NULL DEFAULT 'NLHE';
@@ -0,0 +1,89 @@
+-- Range-partition hands by month on created_at, with months in UTC.
+-- Partitioned tables need the partition key in the primary key, so it becomes (id, created_at)
+-- and no longer keeps ids unique on its own; hand_ids does that instead.
+ALTER TABLE hands RENAME TO hands_unpartitioned;
+ALTER TABLE hands_unpartitioned RENAME CONSTRAINT hands_pkey TO hands_unpartitioned_pkey;
+
+CREATE TABLE hands (
+    id UUID NOT NULL DEFAULT gen_random_uuid(),
+    stacks JSONB NOT NULL,
+    dealer_position INTEGER NOT NULL,
+    small_blind_position INTEGER NOT NULL,
+    big_blind_position INTEGER NOT NULL,
+    player_cards JSONB NOT NULL,
+    action_sequence JSONB NOT NULL,
+    winnings JSONB NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    variant TEXT NOT NULL DEFAULT 'NLHE',
+    PRIMARY KEY (id, created_at)
+) PARTITION BY RANGE (created_at);
+
+CREATE INDEX hands_created_at_idx ON hands (created_at DESC);
+CREATE INDEX hands_id_idx ON hands (id);
+
+-- Every hand id, kept unique across partitions by the triggers below. Ids of archived
+-- (dropped) partitions stay here, so they are never reused either
+CREATE TABLE hand_ids (id UUID PRIMARY KEY);
+
+CREATE FUNCTION track_hand_id() RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO hand_ids (id) VALUES (NEW.id);
+    ELSE
+        DELETE FROM hand_ids WHERE id = OLD.id;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER hands_track_id AFTER INSERT OR DELETE ON hands
+    FOR EACH ROW EXECUTE FUNCTION track_hand_id();
+
+-- Catches rows outside every monthly partition until ensure_hands_partition creates theirs
+CREATE TABLE hands_default PARTITION OF hands DEFAULT;
+
+-- Create the monthly partition containing `month` if missing, moving any of its rows out of hands_default.
+-- Its bounds are midnight UTC, whatever the session's time zone
+CREATE OR REPLACE FUNCTION ensure_hands_partition(month DATE) RETURNS TEXT AS $$
+DECLARE
+    range_start TIMESTAMPTZ := date_trunc('month', month::TIMESTAMP) AT TIME ZONE 'UTC';
+    range_end TIMESTAMPTZ := (date_trunc('month', month::TIMESTAMP) + INTERVAL '1 month') AT TIME ZONE 'UTC';
+    partition_name TEXT := 'hands_' || to_char(month, 'YYYY_MM');
+BEGIN
+    IF to_regclass(partition_name) IS NOT NULL THEN
+        RETURN partition_name;
+    END IF;
+
+    CREATE TEMP TABLE hands_partition_moving (LIKE hands);
+    WITH moved AS (
+        DELETE FROM hands_default
+        WHERE created_at >= range_start AND created_at < range_end
+        RETURNING *
+    )
+    INSERT INTO hands_partition_moving SELECT * FROM moved;
+
+    EXECUTE format(
+        'CREATE TABLE %I PARTITION OF hands FOR VALUES FROM (%L) TO (%L)',
+        partition_name, range_start, range_end
+    );
+
+    INSERT INTO hands SELECT * FROM hands_partition_moving;
+    DROP TABLE hands_partition_moving;
+    RETURN partition_name;
+END;
+$$ LANGUAGE plpgsql;
+
+SELECT ensure_hands_partition(month::DATE)
+FROM generate_series(
+    date_trunc('month', (SELECT MIN(created_at) FROM hands_unpartitioned) AT TIME ZONE 'UTC'),
+    date_trunc('month', CURRENT_TIMESTAMP AT TIME ZONE 'UTC'),
+    INTERVAL '1 month'
+) AS month;
+
+INSERT INTO hands (id, stacks, dealer_position, small_blind_position, big_blind_position,
+                   player_cards, action_sequence, winnings, created_at, variant)
+SELECT id, stacks, dealer_position, small_blind_position, big_blind_position,
+       player_cards, action_sequence, winnings, COALESCE(created_at, CURRENT_TIMESTAMP), variant
+FROM hands_unpartitioned;
+
+DROP TABLE hands_unpartitioned;
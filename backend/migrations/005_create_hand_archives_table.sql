@@ -0,0 +1,9 @@
+-- Catalog of monthly hands partitions exported to columnar files and detached
+CREATE TABLE IF NOT EXISTS hand_archives (
+    partition_name TEXT PRIMARY KEY,
+    range_start TIMESTAMP WITH TIME ZONE NOT NULL,
+    range_end TIMESTAMP WITH TIME ZONE NOT NULL,
+    path TEXT NOT NULL,
+    row_count INTEGER NOT NULL,
+    archived_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
@@ -0,0 +1,4 @@
+-- Street-boundary betting state snapshots (HandReplay.snapshot_document) used to
+-- serve GET /hands/{id}/state without replaying from the first action.
+-- NULL for hands saved before this column existed; those are replayed in full.
+ALTER TABLE hands ADD COLUMN IF NOT EXISTS state_snapshots JSONB;
@@ -0,0 +1,4 @@
+-- Lease on running jobs: the worker running a job refreshes heartbeat_at while it
+-- runs, and only jobs whose heartbeat has expired are put back on the queue, so
+-- jobs still running in another worker process are never requeued.
+ALTER TABLE jobs ADD COLUMN IF NOT EXISTS heartbeat_at TIMESTAMP WITH TIME ZONE;
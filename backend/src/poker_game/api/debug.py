@@ -0,0 +1,49 @@
+# poker_game/api/debug.py
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, Response
+from ..profiling import PROFILE_STORE, mark_stage, should_profile, start_profile
+
+router = APIRouter(prefix="/debug", tags=["debug"])
+
+# Endpoints that honour the profile flag
+PROFILED_PREFIXES = ("/hands",)
+
+# Opt-in flag: ?profile=1 (or ?profile=stages), or the X-Profile header
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_HEADER = "X-Profile"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+# HTTP middleware (registered in main.py) that profiles flagged, sampled requests
+async def profiling_middleware(request: Request, call_next):
+    if not request.url.path.startswith(PROFILED_PREFIXES):
+        return await call_next(request)
+    mode = should_profile(request.query_params.get(PROFILE_QUERY_PARAM) or request.headers.get(PROFILE_HEADER))
+    if mode is None:
+        return await call_next(request)
+    with start_profile(f"{request.method} {request.url.path}", mode) as profile:
+        response = await call_next(request)
+        # Time since the handler's last mark is response serialization
+        mark_stage("serialization")
+    response.headers[PROFILE_ID_HEADER] = profile.id
+    return response
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = "json"):
+    profile = PROFILE_STORE.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format == "json":
+        return JSONResponse(content=profile.report())
+    if format == "text":
+        return PlainTextResponse(profile.stats_text(limit=None) or "No cProfile capture for this profile\n")
+    if format == "pstats":
+        data = profile.pstats_bytes()
+        if data is None:
+            raise HTTPException(status_code=404, detail="No cProfile capture for this profile")
+        return Response(
+            content=data,
+            media_type="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{profile_id}.pstats"'}
+        )
+    raise HTTPException(status_code=422, detail="Format must be one of json, text, pstats")
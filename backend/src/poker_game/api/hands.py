@@ -1,49 +1,36 @@
 # poker_game/api/hands.py 
 
 from fastapi import APIRouter, Depends, HTTPException
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, ValidationInfo, field_validator
 from uuid import UUID
 from typing import List, Dict, Optional
 import asyncpg
 import os
 from ..models.hand import Hand
 from ..repositories.hand_repository import HandRepository
+from ..repositories.db_pools import DatabasePools
 from ..domain.poker_service import PokerService
+from ..domain.action_log import HandReplay, compile_actions, parse_action_sequence, to_actions, validate_actions
+from ..domain.variants import DEFAULT_VARIANT, blind_positions, get_variant, validate_player_count
+from ..profiling import mark_stage, profile_stage
+from .responses import FastJSONResponse, RawJSONResponse
 
-router = APIRouter(prefix="/hands", tags=["hands"])
+router = APIRouter(prefix="/hands", tags=["hands"], default_response_class=FastJSONResponse)
 
-# Global database pool (to be initialized in main.py)
+# Global database pools (to be initialized in main.py); db_pool is the primary
+db_pools: Optional[DatabasePools] = None
 db_pool: Optional[asyncpg.Pool] = None
 
-# Pydantic model for action validation
+# Pydantic model for action payloads (legality is checked on the compiled log in create_hand)
 class Action(BaseModel):
     type: str
     player: Optional[str] = None
     amount: Optional[int] = None
     cards: Optional[str] = None
 
-    @validator('type')
-    def validate_action_type(cls, v):
-        valid_types = ["fold", "check", "call", "bet", "raise", "allin", "flop", "turn", "river"]
-        if v not in valid_types:
-            raise ValueError(f"Action type must be one of {valid_types}")
-        return v
-
-    @validator('amount')
-    def validate_amount(cls, v, values):
-        if 'type' in values and values['type'] in ["bet", "raise"] and (v is None or v <= 0):
-            raise ValueError(f"Amount must be provided and greater than 0 for {values['type']}")
-        return v
-
-    @validator('cards')
-    def validate_cards_field(cls, v, values):
-        if 'type' in values and values['type'] in ["flop", "turn", "river"] and v is None:
-            raise ValueError(f"Cards must be provided for {values['type']}")
-        return v
-
 # Pydantic model for input validation
 class HandCreateRequest(BaseModel):
+    variant: str = DEFAULT_VARIANT
     stacks: List[int]
     player_cards: List[List[str]]
     actions: List[Action]
@@ -52,43 +39,54 @@ class HandCreateRequest(BaseModel):
     big_blind_position: int
     winnings: Optional[dict] = None
 
-    @validator('player_cards')
-    def validate_cards(cls, v):
-        for cards in v:
-            if len(cards) != 2:
-                raise ValueError("Each player must have exactly 2 cards")
-        if len(v) != 6:
-            raise ValueError("Exactly 6 players are required")
+    @field_validator('variant')
+    @classmethod
+    def validate_variant(cls, v: str) -> str:
+        get_variant(v)
+        return v
+
+    @field_validator('stacks')
+    @classmethod
+    def validate_stacks(cls, v: List[int], info: ValidationInfo) -> List[int]:
+        if 'variant' in info.data:
+            validate_player_count(len(v), get_variant(info.data['variant']))
         return v
 
-    @validator('stacks')
-    def validate_stacks(cls, v, values):
-        if 'player_cards' in values and len(v) != len(values['player_cards']):
-            raise ValueError("Number of stacks must match number of players (6)")
+    @field_validator('player_cards')
+    @classmethod
+    def validate_cards(cls, v: List[List[str]], info: ValidationInfo) -> List[List[str]]:
+        if 'variant' in info.data:
+            hole_cards = get_variant(info.data['variant']).hole_cards
+            for cards in v:
+                if len(cards) != hole_cards:
+                    raise ValueError(f"Each player must have exactly {hole_cards} cards")
+        if 'stacks' in info.data and len(v) != len(info.data['stacks']):
+            raise ValueError(f"Number of players must match number of stacks ({len(info.data['stacks'])})")
         return v
 
-    @validator('dealer_position')
-    def validate_dealer_position(cls, v):
-        if not (0 <= v <= 5):
-            raise ValueError("Dealer position must be between 0 and 5")
+    @field_validator('dealer_position')
+    @classmethod
+    def validate_dealer_position(cls, v: int, info: ValidationInfo) -> int:
+        if 'player_cards' in info.data:
+            player_count = len(info.data['player_cards'])
+            if not (0 <= v < player_count):
+                raise ValueError(f"Dealer position must be between 0 and {player_count - 1}")
         return v
 
-    @validator('small_blind_position')
-    def validate_small_blind_position(cls, v, values):
-        if not (0 <= v <= 5):
-            raise ValueError("Small blind position must be between 0 and 5")
-        if 'dealer_position' in values:
-            expected_small_blind = (values['dealer_position'] + 1) % 6
+    @field_validator('small_blind_position')
+    @classmethod
+    def validate_small_blind_position(cls, v: int, info: ValidationInfo) -> int:
+        if 'player_cards' in info.data and 'dealer_position' in info.data:
+            expected_small_blind, _ = blind_positions(info.data['dealer_position'], len(info.data['player_cards']))
             if v != expected_small_blind:
-                raise ValueError(f"Small blind position must be one position after dealer (expected {expected_small_blind})")
+                raise ValueError(f"Small blind position must follow the dealer (expected {expected_small_blind})")
         return v
 
-    @validator('big_blind_position')
-    def validate_big_blind_position(cls, v, values):
-        if not (0 <= v <= 5):
-            raise ValueError("Big blind position must be between 0 and 5")
-        if 'small_blind_position' in values:
-            expected_big_blind = (values['small_blind_position'] + 1) % 6
+    @field_validator('big_blind_position')
+    @classmethod
+    def validate_big_blind_position(cls, v: int, info: ValidationInfo) -> int:
+        if 'player_cards' in info.data and 'dealer_position' in info.data:
+            _, expected_big_blind = blind_positions(info.data['dealer_position'], len(info.data['player_cards']))
             if v != expected_big_blind:
                 raise ValueError(f"Big blind position must be one position after small blind (expected {expected_big_blind})")
         return v
@@ -99,27 +97,33 @@ class HandCreateResponse(BaseModel):
 
 # Function to initialize the pool (called in main.py)
 async def init_db_pool():
-    global db_pool
+    global db_pools, db_pool
     try:
         database_url = os.getenv("DATABASE_URL")
         if not database_url:
             raise ValueError("DATABASE_URL environment variable not set")
+        replica_url = os.getenv("DATABASE_REPLICA_URL")
         print(f"Initializing db_pool with DATABASE_URL: {database_url}")
-        db_pool = await asyncpg.create_pool(
+        if replica_url:
+            print(f"Routing reads to replica at DATABASE_REPLICA_URL: {replica_url}")
+        db_pools = await DatabasePools.create(
             database_url,
+            replica_url,
             min_size=2,
-            max_size=10
+            max_size=10,
+            max_replica_lag=float(os.getenv("DATABASE_REPLICA_MAX_LAG", "5"))
         )
-        if db_pool is None:
-            raise ValueError("Failed to create database pool")
+        db_pool = db_pools.primary
     except Exception as e:
         raise RuntimeError(f"Database connection failed: {str(e)}")
 
 # Function to close the pool (called on shutdown in main.py)
 async def close_db_pool():
-    global db_pool
-    if db_pool is not None:
-        await db_pool.close()
+    global db_pools, db_pool
+    if db_pools is not None:
+        await db_pools.close()
+        db_pools = None
+        db_pool = None
 
 # Dependency to get the shared database pool
 async def get_db_pool() -> asyncpg.Pool:
@@ -130,58 +134,81 @@ async def get_db_pool() -> asyncpg.Pool:
         )
     return db_pool
 
+# Dependency to get the role-aware pools (primary for writes, replica for reads)
+async def get_db_pools() -> DatabasePools:
+    if db_pools is None:
+        raise HTTPException(
+            status_code=500,
+            detail="Database pool not initialized"
+        )
+    return db_pools
+
 @router.post("/", response_model=HandCreateResponse, status_code=201)
 async def create_hand(
     hand_data: HandCreateRequest,
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pools: DatabasePools = Depends(get_db_pools)
 ):
+    # Request parsing and Pydantic validation, for profiled requests
+    mark_stage("validation")
     try:
-        positions = [
-            hand_data.dealer_position,
-            hand_data.small_blind_position,
-            hand_data.big_blind_position
-        ]
-        if not (positions == sorted(set(positions))):
-            raise ValueError("Positions must be unique and in dealer → small blind → big blind order")
-        
-        # Use provided winnings if available, otherwise calculate
-        winnings = hand_data.winnings if hand_data.winnings is not None else {}
-        if not winnings:
-            last_action = hand_data.actions[-1] if hand_data.actions else None
-            if last_action and last_action.type == "fold" and len(hand_data.actions) > 1:
-                winner = hand_data.actions[-2].player if hand_data.actions[-2].player != last_action.player else None
-                if winner:
-                    pot = sum([action.amount or 0 for action in hand_data.actions if action.type in ["call", "bet", "raise"]])
-                    winnings = {winner: pot}
-
-        # Convert Action objects to dictionaries for JSONB storage
-        action_sequence = [action.dict(exclude_unset=True) for action in hand_data.actions]
-
-        # Prepare data for repository
-        hand_data_dict = {
-            "stacks": hand_data.stacks,
-            "player_cards": hand_data.player_cards,
-            "action_sequence": action_sequence,
-            "winnings": winnings,
-            "dealer_position": hand_data.dealer_position,
-            "small_blind_position": hand_data.small_blind_position,
-            "big_blind_position": hand_data.big_blind_position
-        }
-
-        # Debug: Log hand_data_dict
-        print(f"Debug: hand_data_dict = {hand_data_dict}, stacks type = {type(hand_data_dict['stacks'])}")
+        with profile_stage("validation"):
+            expected_blinds = blind_positions(hand_data.dealer_position, len(hand_data.player_cards))
+            if (hand_data.small_blind_position, hand_data.big_blind_position) != expected_blinds:
+                raise ValueError("Positions must be in dealer → small blind → big blind order")
+
+            # Compile the action log once and check betting legality in a single pass,
+            # keeping the street snapshots recorded on the way for the state endpoint
+            compiled_actions = compile_actions([action.model_dump(exclude_unset=True) for action in hand_data.actions])
+            state_snapshots = validate_actions(
+                compiled_actions,
+                hand_data.stacks,
+                hand_data.dealer_position,
+                hand_data.small_blind_position,
+                hand_data.big_blind_position,
+                betting=get_variant(hand_data.variant).betting
+            )
+
+        with profile_stage("handler"):
+            # Use provided winnings if available, otherwise calculate
+            winnings = hand_data.winnings if hand_data.winnings is not None else {}
+            if not winnings:
+                last_action = hand_data.actions[-1] if hand_data.actions else None
+                if last_action and last_action.type == "fold" and len(hand_data.actions) > 1:
+                    winner = hand_data.actions[-2].player if hand_data.actions[-2].player != last_action.player else None
+                    if winner:
+                        pot = sum([action.amount or 0 for action in hand_data.actions if action.type in ["call", "bet", "raise"]])
+                        winnings = {winner: pot}
+
+            # Normalised action dictionaries for JSONB storage
+            action_sequence = to_actions(compiled_actions)
+
+            # Prepare data for repository
+            hand_data_dict = {
+                "variant": hand_data.variant,
+                "stacks": hand_data.stacks,
+                "player_cards": hand_data.player_cards,
+                "action_sequence": action_sequence,
+                "winnings": winnings,
+                "dealer_position": hand_data.dealer_position,
+                "small_blind_position": hand_data.small_blind_position,
+                "big_blind_position": hand_data.big_blind_position,
+                "state_snapshots": state_snapshots
+            }
+
+            # Debug: Log hand_data_dict
+            print(f"Debug: hand_data_dict = {hand_data_dict}, stacks type = {type(hand_data_dict['stacks'])}")
 
         # Save to database
-        async with pool.acquire() as conn:
-            repo = HandRepository(conn)
-            saved_hand = await repo.save(hand_data_dict)
-            print(f"Debug: saved_hand = {saved_hand}, type = {type(saved_hand)}")
-            if not isinstance(saved_hand, dict):
-                raise ValueError(f"Expected a dictionary from HandRepository.save(), got: {type(saved_hand)}")
-            hand_id = saved_hand.get("id")
-            if hand_id is None:
-                raise ValueError(f"HandRepository.save() did not return an 'id' key. Got: {saved_hand}")
-            return JSONResponse(content={"id": hand_id}, status_code=201)
+        repo = HandRepository(pools)
+        saved_hand = await repo.save(hand_data_dict)
+        mark_stage("db")
+        print(f"Debug: saved_hand = {saved_hand}, type = {type(saved_hand)}")
+        if not isinstance(saved_hand, dict):
+            raise ValueError(f"Expected a dictionary from HandRepository.save(), got: {type(saved_hand)}")
+        hand_id = saved_hand.get("id")
+        if hand_id is None:
+            raise ValueError(f"HandRepository.save() did not return an 'id' key. Got: {saved_hand}")
+        return FastJSONResponse(content={"id": hand_id}, status_code=201)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
     except asyncpg.PostgresError as e:
@@ -193,13 +220,15 @@ async def create_hand(
 async def get_hands(
     limit: int = 100,
     offset: int = 0,
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pools: DatabasePools = Depends(get_db_pools)
 ):
+    mark_stage("validation")
     try:
-        async with pool.acquire() as conn:
-            repo = HandRepository(conn)
-            hands = await repo.find_all(limit, offset)
-            return hands
+        repo = HandRepository(pools)
+        # JSON is built by Postgres and passed through without decoding
+        hands_json = await repo.find_all_json(limit, offset)
+        mark_stage("db")
+        return RawJSONResponse(hands_json)
     except asyncpg.PostgresError as e:
         raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
     except Exception as e:
@@ -208,16 +237,61 @@ async def get_hands(
 @router.get("/{hand_id}", response_model=Dict)
 async def get_hand_by_id(
     hand_id: UUID,
-    pool: asyncpg.Pool = Depends(get_db_pool)
+    pools: DatabasePools = Depends(get_db_pools)
+):
+    mark_stage("validation")
+    try:
+        repo = HandRepository(pools)
+        hand_json = await repo.find_one_by_id_json(hand_id)
+        mark_stage("db")
+    except asyncpg.PostgresError as e:
+        raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+    if hand_json is None:
+        raise HTTPException(status_code=404, detail="Hand not found")
+    return RawJSONResponse(hand_json)
+
+
+# Build the replay engine for a stored hand, reusing its stored street snapshots.
+# Short-notation logs carry their board cards in place, so street boundaries survive parsing
+def _hand_replay(source: Dict) -> HandReplay:
+    actions = source["action_sequence"]
+    compiled = parse_action_sequence(actions) if isinstance(actions, str) else compile_actions(actions)
+    stacks = source["stacks"]
+    if isinstance(stacks, dict):
+        stacks = [stacks[f"P{i + 1}"] for i in range(len(stacks))]
+    return HandReplay(
+        compiled,
+        stacks,
+        source["dealer_position"],
+        source["small_blind_position"],
+        source["big_blind_position"],
+        betting=get_variant(source["variant"] or DEFAULT_VARIANT).betting,
+        snapshot_document=source["state_snapshots"]
+    )
+
+@router.get("/{hand_id}/state", response_model=Dict)
+async def get_hand_state(
+    hand_id: UUID,
+    at: Optional[int] = None,
+    pools: DatabasePools = Depends(get_db_pools)
 ):
+    """Betting state after the first `at` actions (default: all of them)."""
+    mark_stage("validation")
     try:
-        async with pool.acquire() as conn:
-            repo = HandRepository(conn)
-            hand = await repo.find_one_by_id(hand_id)
-            if hand is None:
-                raise HTTPException(status_code=404, detail="Hand not found")
-            return hand
+        source = await HandRepository(pools).find_replay_source(hand_id)
+        mark_stage("db")
     except asyncpg.PostgresError as e:
         raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+    if source is None:
+        raise HTTPException(status_code=404, detail="Hand not found")
+    try:
+        with profile_stage("replay"):
+            replay = _hand_replay(source)
+            state = replay.state_at(len(replay.compiled) if at is None else at)
+        return replay.describe(state)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
@@ -0,0 +1,88 @@
+# poker_game/api/jobs.py
+
+from fastapi import APIRouter, Depends, HTTPException
+from pydantic import BaseModel, field_validator
+from uuid import UUID
+from typing import Any, Dict, Optional
+import asyncpg
+import os
+from ..repositories.job_repository import JobRepository
+from ..repositories.db_pools import DatabasePools
+from ..domain.job_worker import JOB_HANDLERS, JobWorkerPool
+from .hands import get_db_pool
+
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+# Global worker pool (started in main.py's lifespan)
+job_workers: Optional[JobWorkerPool] = None
+
+# Set to "0" in processes that only serve requests. The multi-worker launcher runs the
+# job pool in its first worker alone, so JOB_WORKERS and JOB_PROCESSES are the limits
+# for the whole deployment rather than per worker
+JOB_WORKERS_ENABLED_ENV = "JOB_WORKERS_ENABLED"
+
+# Pydantic model for job submission
+class JobCreateRequest(BaseModel):
+    kind: str
+    params: Dict[str, Any] = {}
+    priority: int = 0
+
+    @field_validator('kind')
+    @classmethod
+    def validate_kind(cls, v: str) -> str:
+        if v not in JOB_HANDLERS:
+            raise ValueError(f"Job kind must be one of {sorted(JOB_HANDLERS)}")
+        return v
+
+# Pydantic model for POST response
+class JobCreateResponse(BaseModel):
+    id: UUID
+
+# Function to start the worker pool (called in main.py)
+async def start_job_workers(pools: DatabasePools):
+    global job_workers
+    if os.getenv(JOB_WORKERS_ENABLED_ENV, "1") == "0":
+        return
+    concurrency = int(os.getenv("JOB_WORKERS", "2"))
+    lease_timeout = float(os.getenv("JOB_LEASE_SECONDS", "60"))
+    job_workers = JobWorkerPool(pools, concurrency=concurrency, lease_timeout=lease_timeout)
+    await job_workers.start()
+
+# Function to stop the worker pool (called on shutdown in main.py)
+async def stop_job_workers():
+    global job_workers
+    if job_workers is not None:
+        await job_workers.stop()
+        job_workers = None
+
+@router.post("/", response_model=JobCreateResponse, status_code=202)
+async def create_job(
+    job_data: JobCreateRequest,
+    pool: asyncpg.Pool = Depends(get_db_pool)
+):
+    try:
+        async with pool.acquire() as conn:
+            job = await JobRepository(conn).create(job_data.kind, job_data.params, job_data.priority)
+        if job_workers is not None:
+            job_workers.notify()
+        return job
+    except asyncpg.PostgresError as e:
+        raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+
+@router.get("/{job_id}", response_model=Dict)
+async def get_job(
+    job_id: UUID,
+    pool: asyncpg.Pool = Depends(get_db_pool)
+):
+    try:
+        async with pool.acquire() as conn:
+            job = await JobRepository(conn).find_one_by_id(job_id)
+    except asyncpg.PostgresError as e:
+        raise HTTPException(status_code=400, detail=f"Database error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
@@ -0,0 +1,16 @@
+# poker_game/api/responses.py
+
+from typing import Any
+import orjson
+from fastapi.responses import JSONResponse, Response
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+class RawJSONResponse(Response):
+    """A body that is already JSON (e.g. built by Postgres), sent as-is without re-encoding."""
+
+    media_type = "application/json"
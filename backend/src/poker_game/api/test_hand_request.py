@@ -0,0 +1,51 @@
+# backend/tests/poker_game/api/test_hand_request.py
+import pytest
+from pydantic import ValidationError
+from src.poker_game.api.hands import HandCreateRequest
+from src.poker_game.domain.variants import NO_LIMIT, POT_LIMIT, get_variant
+
+CARDS = ["Tc", "2c", "5d", "4c", "Ah", "4s", "Qc", "Td", "Js", "9d", "8h", "6s", "Kc", "Kd", "3s", "3d", "7h", "7s", "9c", "2h"]
+
+def _request(player_count, dealer, small_blind, big_blind, variant="NLHE"):
+    hole_cards = get_variant(variant).hole_cards
+    return HandCreateRequest(
+        variant=variant,
+        stacks=[1000] * player_count,
+        player_cards=[CARDS[i * hole_cards:(i + 1) * hole_cards] for i in range(player_count)],
+        actions=[{"type": "fold"}],
+        dealer_position=dealer,
+        small_blind_position=small_blind,
+        big_blind_position=big_blind
+    )
+
+@pytest.mark.parametrize("player_count, dealer, small_blind, big_blind", [
+    (2, 0, 0, 1),   # heads-up: the dealer posts the small blind
+    (2, 1, 1, 0),
+    (9, 8, 0, 1),
+    (10, 9, 0, 1),
+    (10, 4, 5, 6),
+])
+def test_blinds_follow_the_dealer(player_count, dealer, small_blind, big_blind):
+    request = _request(player_count, dealer, small_blind, big_blind)
+    assert len(request.player_cards) == player_count
+
+@pytest.mark.parametrize("player_count, dealer, small_blind, big_blind", [
+    (2, 0, 1, 0),
+    (10, 9, 9, 0),
+    (9, 0, 2, 3),
+])
+def test_misplaced_blinds_are_rejected(player_count, dealer, small_blind, big_blind):
+    with pytest.raises(ValidationError):
+        _request(player_count, dealer, small_blind, big_blind)
+
+def test_table_size_and_hole_cards_follow_the_variant():
+    with pytest.raises(ValidationError):
+        _request(1, 0, 0, 0)
+    assert len(_request(4, 0, 1, 2, variant="PLO").player_cards[0]) == 4
+    with pytest.raises(ValidationError):
+        HandCreateRequest(
+            variant="PLO", stacks=[1000, 1000], player_cards=[["As", "Kd"], ["Qh", "Jc"]],
+            actions=[], dealer_position=0, small_blind_position=0, big_blind_position=1
+        )
+    assert get_variant("NLHE").betting == NO_LIMIT
+    assert get_variant("PLO").betting == POT_LIMIT
@@ -0,0 +1,68 @@
+# backend/tests/poker_game/api/test_hand_state.py
+from uuid import uuid4
+import json
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.poker_game.api.hands import get_db_pools, router as hands_router
+from src.poker_game.domain.action_log import compile_actions, validate_actions
+from src.poker_game.repositories.db_pools import DatabasePools
+
+ACTIONS = [
+    {"type": "call", "player": "P1"},
+    {"type": "check", "player": "P2"},
+    {"type": "flop", "cards": "3hKdQs"},
+    {"type": "bet", "player": "P2", "amount": 40},
+    {"type": "call", "player": "P1"},
+]
+
+def _record(snapshots):
+    return {
+        "id": uuid4(),
+        "stacks": json.dumps([1000, 1000]),
+        "dealer_position": 0,
+        "small_blind_position": 0,
+        "big_blind_position": 1,
+        "action_sequence": json.dumps(ACTIONS),
+        "variant": "NLHE",
+        "state_snapshots": json.dumps(snapshots) if snapshots is not None else None
+    }
+
+def test_state_at_index_with_and_without_stored_snapshots(hands_client):
+    snapshots = validate_actions(compile_actions(ACTIONS), [1000, 1000], 0, 0, 1)
+    for stored in (snapshots, None):
+        record = _record(stored)
+        client, _ = hands_client(record)
+        hand_id = record["id"]
+        state = client.get(f"/hands/{hand_id}/state", params={"at": 4}).json()
+        assert state["street"] == "flop"
+        assert state["pot"] == 120
+        assert state["to_act"] == "P1"
+        assert client.get(f"/hands/{hand_id}/state").json()["pot"] == 160
+
+def test_state_rejects_out_of_range_index(hands_client):
+    record = _record(None)
+    client, _ = hands_client(record)
+    hand_id = record["id"]
+    assert client.get(f"/hands/{hand_id}/state", params={"at": 99}).status_code == 422
+
+def test_state_of_hand_stored_in_short_notation(hands_client):
+    record = _record(None)
+    record["action_sequence"] = json.dumps("fff:c:x:3hKdQs:b40:c")
+    client, _ = hands_client(record)
+    state = client.get(f"/hands/{record['id']}/state", params={"at": 3}).json()
+    assert state["street"] == "flop" and state["to_act"] == "P2"
+    # A board lumped at the end can't be placed on its street
+    record["action_sequence"] = json.dumps("fff:c:x:b40:c:3hKdQs")
+    client, _ = hands_client(record)
+    assert client.get(f"/hands/{record['id']}/state").status_code == 422
+
+def test_state_is_read_from_the_primary(fake_pool):
+    # A caught-up replica that doesn't have the just-posted hand yet
+    record = _record(None)
+    pools = DatabasePools(fake_pool(record), fake_pool(0.0))
+    app = FastAPI()
+    app.include_router(hands_router)
+    app.dependency_overrides[get_db_pools] = lambda: pools
+    response = TestClient(app).get(f"/hands/{record['id']}/state")
+    assert response.status_code == 200
+    assert all("FROM hands" not in query for query, _ in pools.replica.connection.queries)
@@ -0,0 +1,67 @@
+# backend/tests/poker_game/api/test_jobs.py
+from datetime import datetime, timezone
+from uuid import uuid4
+import json
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.poker_game.api import jobs
+from src.poker_game.api.hands import get_db_pool
+
+class FakeJobWorkers:
+    def __init__(self):
+        self.notified = 0
+
+    def notify(self):
+        self.notified += 1
+
+@pytest.fixture
+def jobs_client(monkeypatch, fake_pool):
+    """Factory for a jobs API client whose database answers every query with `result`."""
+    workers = FakeJobWorkers()
+    monkeypatch.setattr(jobs, "job_workers", workers)
+
+    def make(result):
+        app = FastAPI()
+        app.include_router(jobs.router)
+        pool = fake_pool(result)
+        app.dependency_overrides[get_db_pool] = lambda: pool
+        return TestClient(app), pool.connection, workers
+    return make
+
+def test_submitting_a_job_queues_it_and_wakes_the_workers(jobs_client):
+    job_id = uuid4()
+    client, connection, workers = jobs_client({"id": job_id})
+    response = client.post("/jobs/", json={"kind": "audit", "priority": 3})
+    assert response.status_code == 202
+    assert response.json() == {"id": str(job_id)}
+    assert connection.queries[0][1][1:] == ("audit", 3, "{}")
+    assert workers.notified == 1
+
+def test_unknown_job_kind_is_rejected(jobs_client):
+    client, connection, workers = jobs_client(None)
+    response = client.post("/jobs/", json={"kind": "mine_bitcoin"})
+    assert response.status_code == 422
+    assert connection.queries == [] and workers.notified == 0
+
+def test_job_status(jobs_client):
+    job_id = uuid4()
+    record = {
+        "id": job_id, "kind": "export", "status": "done", "priority": 0, "params": "{}", "progress": 1.0,
+        "result": json.dumps({"count": 0, "hands": []}), "error": None,
+        "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc), "started_at": None, "finished_at": None,
+        "heartbeat_at": None
+    }
+    client, _, _ = jobs_client(record)
+    job = client.get(f"/jobs/{job_id}").json()
+    assert job["status"] == "done" and job["result"] == {"count": 0, "hands": []}
+
+    client, _, _ = jobs_client(None)
+    assert client.get(f"/jobs/{uuid4()}").status_code == 404
+
+@pytest.mark.asyncio
+async def test_job_pool_can_be_disabled(monkeypatch, fake_pool):
+    monkeypatch.setattr(jobs, "job_workers", None)
+    monkeypatch.setenv(jobs.JOB_WORKERS_ENABLED_ENV, "0")
+    await jobs.start_job_workers(fake_pool())
+    assert jobs.job_workers is None
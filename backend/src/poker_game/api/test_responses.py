@@ -0,0 +1,39 @@
+# backend/tests/poker_game/api/test_responses.py
+from uuid import uuid4
+import json
+from src.poker_game.api.responses import FastJSONResponse, RawJSONResponse
+
+# JSON exactly as Postgres serializes it, JSONB columns embedded
+HANDS_JSON = (
+    '[{"id" : "7d3f0d6e-3d39-4a5b-9a7e-5f0c1b2a3c4d", "stacks" : {"P1": 1000, "P2": 960}, '
+    '"action_sequence" : [{"type": "fold", "player": "P1"}], "variant" : "NLHE"}]'
+)
+
+def test_renderers():
+    assert FastJSONResponse({"a": [1, "ü"]}).body == json.dumps({"a": [1, "ü"]}, ensure_ascii=False, separators=(",", ":")).encode()
+    assert FastJSONResponse({1: "P1"}).body == b'{"1":"P1"}'
+    raw = RawJSONResponse(HANDS_JSON)
+    assert raw.body == HANDS_JSON.encode()
+    assert raw.media_type == "application/json"
+
+def test_hand_list_is_passed_through_verbatim(hands_client):
+    client, connection = hands_client(HANDS_JSON)
+    response = client.get("/hands/", params={"limit": 1})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    assert response.content == HANDS_JSON.encode()
+    assert response.json()[0]["stacks"] == {"P1": 1000, "P2": 960}
+    assert "json_agg" in connection.queries[0][0]
+
+def test_hand_by_id_is_passed_through_verbatim(hands_client):
+    hand_json = HANDS_JSON[1:-1]
+    client, _ = hands_client(hand_json)
+    response = client.get(f"/hands/{uuid4()}")
+    assert response.status_code == 200
+    assert response.content == hand_json.encode()
+
+def test_missing_hand_is_a_404(hands_client):
+    client, _ = hands_client(None)
+    response = client.get(f"/hands/{uuid4()}")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Hand not found"
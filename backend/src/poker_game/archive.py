@@ -0,0 +1,53 @@
+# Archive cold monthly hands partitions to columnar files.
+#   python -m src.poker_game.archive --older-than-months 6 --archive-dir ./archive
+from datetime import datetime, timezone
+from typing import List, Optional
+import argparse
+import asyncio
+import asyncpg
+import os
+from .repositories.hand_repository import HandRepository
+
+async def archive_cold_partitions(
+    older_than_months: int,
+    archive_dir: str,
+    pool: Optional[asyncpg.Pool] = None
+) -> List[str]:
+    """
+    Archive every monthly partition that ended more than `older_than_months`
+    months before the start of the current month. Returns the archived partition names.
+    """
+    if older_than_months < 1:
+        raise ValueError("older_than_months must be at least 1 so the current month is never archived")
+    database_url = os.getenv("DATABASE_URL")
+    if pool is None and not database_url:
+        raise ValueError("DATABASE_URL environment variable not set")
+    local_pool = pool or await asyncpg.create_pool(database_url)
+
+    now = datetime.now(timezone.utc)
+    months = now.year * 12 + (now.month - 1) - older_than_months
+    cutoff = datetime(months // 12, months % 12 + 1, 1, tzinfo=timezone.utc)
+
+    archived = []
+    try:
+        async with local_pool.acquire() as conn:
+            repo = HandRepository(conn)
+            for partition in await repo.list_partitions():
+                if partition["range_end"] > cutoff:
+                    continue
+                # Stored absolute so find_archived works from any working directory
+                path = os.path.abspath(os.path.join(archive_dir, f"{partition['partition_name']}.json.gz"))
+                row_count = await repo.archive_partition(partition, path)
+                print(f"Archived {partition['partition_name']} ({row_count} hands) to {path}")
+                archived.append(partition["partition_name"])
+    finally:
+        if pool is None:
+            await local_pool.close()
+    return archived
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Archive cold hands partitions to columnar files")
+    parser.add_argument("--older-than-months", type=int, default=int(os.getenv("HANDS_ARCHIVE_AFTER_MONTHS", "6")))
+    parser.add_argument("--archive-dir", default=os.getenv("HANDS_ARCHIVE_DIR", "archive"))
+    args = parser.parse_args()
+    asyncio.run(archive_cold_partitions(args.older_than_months, args.archive_dir))
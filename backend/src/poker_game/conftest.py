@@ -0,0 +1,65 @@
+# backend/tests/poker_game/conftest.py
+#
+# Fakes for the asyncpg pool and a client for the hands API on top of them, shared by
+# the tests that don't need a database.
+from contextlib import asynccontextmanager
+import asyncio
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from src.poker_game.api.hands import get_db_pools, router as hands_router
+from src.poker_game.repositories.db_pools import DatabasePools
+
+class FakeConnection:
+    """
+    Answers every query with `result` (raised if it is an exception), after `delay`
+    seconds if set, honouring asyncpg's `timeout` argument. Queries are recorded.
+    """
+
+    def __init__(self, result=None, delay=None):
+        self.result = result
+        self.delay = delay
+        self.queries = []
+
+    async def _respond(self, query, args, timeout):
+        self.queries.append((query, args))
+        if self.delay is not None:
+            await asyncio.wait_for(asyncio.sleep(self.delay), timeout)
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+    async def fetch(self, query, *args, timeout=None):
+        return await self._respond(query, args, timeout)
+
+    async def fetchrow(self, query, *args, timeout=None):
+        return await self._respond(query, args, timeout)
+
+    async def fetchval(self, query, *args, timeout=None):
+        return await self._respond(query, args, timeout)
+
+    async def execute(self, query, *args, timeout=None):
+        return await self._respond(query, args, timeout)
+
+class FakePool:
+    def __init__(self, result=None, delay=None):
+        self.connection = FakeConnection(result, delay)
+
+    @asynccontextmanager
+    async def acquire(self, timeout=None):
+        yield self.connection
+
+@pytest.fixture
+def fake_pool():
+    return FakePool
+
+@pytest.fixture
+def hands_client():
+    """Factory for a hands API client whose database answers every query with `result`."""
+    def make(result):
+        app = FastAPI()
+        app.include_router(hands_router)
+        pools = DatabasePools(FakePool(result))
+        app.dependency_overrides[get_db_pools] = lambda: pools
+        return TestClient(app), pools.primary.connection
+    return make
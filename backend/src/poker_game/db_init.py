@@ -1,8 +1,107 @@
-from typing import Optional
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional
 import asyncpg
 import asyncio
 import os
 
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "../../migrations")
+
+# Monthly hands partitions created ahead of time on every startup
+PARTITION_MONTHS_AHEAD = int(os.getenv("HANDS_PARTITION_MONTHS_AHEAD", "2"))
+
+# Advisory lock key serializing schema setup across processes starting at once
+MIGRATION_LOCK_KEY = 7_180_000_001
+
+@asynccontextmanager
+async def migration_lock(conn: asyncpg.Connection) -> AsyncIterator[None]:
+    """
+    Hold the migration advisory lock on `conn`, so only one process (e.g. one of
+    several workers starting together) applies migrations and creates partitions;
+    the others wait and then find nothing left to do.
+    """
+    await conn.execute("SELECT pg_advisory_lock($1)", MIGRATION_LOCK_KEY)
+    try:
+        yield
+    finally:
+        await conn.execute("SELECT pg_advisory_unlock($1)", MIGRATION_LOCK_KEY)
+
+async def _adopt_legacy_schema(conn: asyncpg.Connection) -> None:
+    # Databases created before the migration runner already have the 001 schema;
+    # record it as applied instead of re-running its DROP TABLE.
+    column_types = await conn.fetch(
+        """
+        SELECT column_name, data_type
+        FROM information_schema.columns
+        WHERE table_name = 'hands'
+        AND column_name IN ('stacks', 'player_cards', 'action_sequence', 'winnings')
+        """
+    )
+    for column in column_types:
+        if column['data_type'].lower() != 'jsonb':
+            await conn.execute(f"""
+                ALTER TABLE hands
+                ALTER COLUMN {column['column_name']} TYPE JSONB
+                USING {column['column_name']}::JSONB
+            """)
+            print(f"Altered column {column['column_name']} to JSONB")
+    await conn.execute(
+        "INSERT INTO schema_migrations (version) VALUES ('001_create_hands_table.sql')"
+    )
+
+async def apply_migrations(conn: asyncpg.Connection) -> List[str]:
+    """
+    Apply every migrations/*.sql file not yet recorded in schema_migrations, in
+    filename order, each in its own transaction. Returns the names applied.
+    """
+    await conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version TEXT PRIMARY KEY,
+            applied_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+        )
+        """
+    )
+    applied = {record['version'] for record in await conn.fetch("SELECT version FROM schema_migrations")}
+    if not applied:
+        table_exists = await conn.fetchval(
+            "SELECT EXISTS (SELECT FROM pg_tables WHERE tablename = 'hands')"
+        )
+        if table_exists:
+            await _adopt_legacy_schema(conn)
+            applied.add('001_create_hands_table.sql')
+
+    if not os.path.isdir(MIGRATIONS_DIR):
+        raise ValueError(f"Migrations directory not found at {MIGRATIONS_DIR}")
+
+    newly_applied = []
+    for migration_name in sorted(f for f in os.listdir(MIGRATIONS_DIR) if f.endswith('.sql')):
+        if migration_name in applied:
+            continue
+        with open(os.path.join(MIGRATIONS_DIR, migration_name), 'r') as f:
+            script_content = f.read()
+        if not script_content.strip():
+            raise ValueError(f"Migration script {migration_name} is empty")
+        async with conn.transaction():
+            await conn.execute(script_content)
+            await conn.execute("INSERT INTO schema_migrations (version) VALUES ($1)", migration_name)
+        print(f"Applied migration {migration_name}")
+        newly_applied.append(migration_name)
+    return newly_applied
+
+async def ensure_hand_partitions(conn: asyncpg.Connection, months_ahead: int = PARTITION_MONTHS_AHEAD) -> List[str]:
+    """Make sure the monthly hands partitions exist from this (UTC) month to `months_ahead` months out."""
+    records = await conn.fetch(
+        """
+        SELECT ensure_hands_partition(
+            (date_trunc('month', CURRENT_TIMESTAMP AT TIME ZONE 'UTC') + make_interval(months => n))::DATE
+        )
+        AS partition_name
+        FROM generate_series(0, $1) AS n
+        """,
+        months_ahead
+    )
+    return [record['partition_name'] for record in records]
+
 async def init_db(pool: Optional[asyncpg.Pool] = None) -> None:
     try:
         database_url = os.getenv("DATABASE_URL")
@@ -13,40 +112,9 @@ async def init_db(pool: Optional[asyncpg.Pool] = None) -> None:
             raise ValueError("Failed to create database pool")
 
         async with local_pool.acquire() as conn:
-            # Check if table exists
-            table_exists = await conn.fetchval(
-                "SELECT EXISTS (SELECT FROM pg_tables WHERE tablename = 'hands')"
-            )
-
-            if not table_exists:
-                # Apply migration script if table doesn't exist
-                migration_path = os.path.join(os.path.dirname(__file__), "../../migrations/001_create_hands_table.sql")
-                if not os.path.exists(migration_path):
-                    raise ValueError(f"Migration script not found at {migration_path}")
-
-                with open(migration_path, 'r') as f:
-                    script_content = f.read()
-                    if not script_content.strip():
-                        raise ValueError("Migration script is empty")
-                    await conn.execute(script_content)
-            else:
-                # Check column types and alter if necessary
-                column_types = await conn.fetch(
-                    """
-                    SELECT column_name, data_type
-                    FROM information_schema.columns
-                    WHERE table_name = 'hands'
-                    AND column_name IN ('stacks', 'player_cards', 'action_sequence', 'winnings')
-                    """
-                )
-                for column in column_types:
-                    if column['data_type'].lower() != 'jsonb':
-                        await conn.execute(f"""
-                            ALTER TABLE hands
-                            ALTER COLUMN {column['column_name']} TYPE JSONB
-                            USING {column['column_name']}::JSONB
-                        """)
-                        print(f"Altered column {column['column_name']} to JSONB")
+            async with migration_lock(conn):
+                await apply_migrations(conn)
+                await ensure_hand_partitions(conn)
 
         if pool is None:
             await local_pool.close()
@@ -59,4 +127,4 @@ async def init_db(pool: Optional[asyncpg.Pool] = None) -> None:
         raise ValueError(f"Unexpected error during database initialization: {str(e)}")
 
 if __name__ == "__main__":
-    asyncio.run(init_db())
\ No newline at end of file
+    asyncio.run(init_db())
@@ -0,0 +1,522 @@
+# backend/src/poker_game/domain/action_log.py
+from array import array
+from bisect import bisect_right
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from .hand_evaluator import card_to_str, parse_cards
+from .variants import NO_LIMIT, POT_LIMIT
+
+# Opcodes of the compiled action log
+FOLD, CHECK, CALL, BET, RAISE, ALLIN, FLOP, TURN, RIVER = range(9)
+
+OPCODES = {
+    "fold": FOLD, "check": CHECK, "call": CALL, "bet": BET, "raise": RAISE,
+    "allin": ALLIN, "flop": FLOP, "turn": TURN, "river": RIVER,
+}
+ACTION_TYPES = {opcode: name for name, opcode in OPCODES.items()}
+BOARD_CARD_COUNTS = {FLOP: 3, TURN: 1, RIVER: 1}
+
+# Short tokens of the "fff:c:b40:5c6c7c" notation for the no-amount actions
+SHORT_TOKENS = {FOLD: "f", CHECK: "x", CALL: "c", ALLIN: "allin"}
+SHORT_OPCODES = {token: opcode for opcode, token in SHORT_TOKENS.items()}
+
+NO_PLAYER = -1
+
+# Largest bet, raise or all-in amount accepted; keeps amounts well inside the int64 opcode array
+MAX_AMOUNT = 10 ** 12
+
+class CompiledActions:
+    """
+    A hand's actions as a flat int array of (opcode, player index, argument) triples.
+
+    The argument is the bet/raise amount, or the board cards packed 6 bits per card.
+    Player index is NO_PLAYER for board cards and for actions whose actor is implicit.
+    """
+
+    __slots__ = ("ops",)
+
+    def __init__(self, ops: Optional[array] = None):
+        self.ops = ops if ops is not None else array("q")
+
+    def append(self, opcode: int, player: int = NO_PLAYER, arg: int = 0) -> None:
+        self.ops.extend((opcode, player, arg))
+
+    def __len__(self) -> int:
+        return len(self.ops) // 3
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        ops = self.ops
+        for i in range(0, len(ops), 3):
+            yield ops[i], ops[i + 1], ops[i + 2]
+
+    def __getitem__(self, index: int) -> Tuple[int, int, int]:
+        if index < 0:
+            index += len(self)
+        if not (0 <= index < len(self)):
+            raise IndexError("action index out of range")
+        i = index * 3
+        return self.ops[i], self.ops[i + 1], self.ops[i + 2]
+
+def pack_cards(cards: Sequence[int]) -> int:
+    packed = 0
+    for i, card in enumerate(cards):
+        packed |= card << (6 * i)
+    return packed
+
+def unpack_cards(packed: int, count: int) -> List[int]:
+    return [(packed >> (6 * i)) & 0x3F for i in range(count)]
+
+def _parse_player(player: Optional[str]) -> int:
+    if not player:
+        return NO_PLAYER
+    if player[0] != "P" or not player[1:].isdigit():
+        raise ValueError(f"Invalid player id: {player}")
+    # Seats are numbered from P1; P0 would alias NO_PLAYER
+    if int(player[1:]) < 1:
+        raise ValueError(f"Invalid player id: {player}")
+    return int(player[1:]) - 1
+
+def _check_amount(amount, action_type: str) -> int:
+    if amount is None:
+        return 0
+    if not isinstance(amount, int) or isinstance(amount, bool) or not (0 <= amount <= MAX_AMOUNT):
+        raise ValueError(f"Amount for {action_type} must be an integer between 0 and {MAX_AMOUNT}")
+    return amount
+
+def compile_actions(actions: Sequence[Dict]) -> CompiledActions:
+    """
+    Compile a JSON action list (as accepted by the API) into opcodes.
+    Player ids and card strings are parsed here, once.
+
+    Raises:
+        ValueError: If an action is malformed.
+    """
+    compiled = CompiledActions()
+    for action in actions:
+        action_type = action.get("type")
+        opcode = OPCODES.get(action_type)
+        if opcode is None:
+            raise ValueError(f"Action type must be one of {list(OPCODES)}")
+
+        if opcode in BOARD_CARD_COUNTS:
+            cards = action.get("cards")
+            if not cards:
+                raise ValueError(f"Cards must be provided for {action_type}")
+            card_list = parse_cards(cards)
+            if len(card_list) != BOARD_CARD_COUNTS[opcode]:
+                raise ValueError(f"Invalid community cards for {action_type}: {cards}")
+            compiled.append(opcode, NO_PLAYER, pack_cards(card_list))
+            continue
+
+        amount = action.get("amount")
+        if opcode in (BET, RAISE):
+            if amount is None or amount <= 0:
+                raise ValueError(f"Amount must be provided and greater than 0 for {action_type}")
+        compiled.append(opcode, _parse_player(action.get("player")), _check_amount(amount, action_type))
+    return compiled
+
+def parse_action_sequence(sequence: str) -> CompiledActions:
+    """
+    Compile the short notation stored on Hand, e.g. "fff:c:b40:c:x:5c6c7c:b80:c:Kd:x:x:As".
+
+    The leading "fff" marks the posted blinds. Board cards appear where they were
+    dealt, so street boundaries are kept: a three-card token is the flop and each
+    following one-card token is the turn, then the river.
+
+    Raises:
+        ValueError: If a token is not recognised or a board token is out of place.
+    """
+    compiled = CompiledActions()
+    tokens = [token for token in sequence.split(":") if token]
+    if tokens and tokens[0] == "fff":
+        tokens = tokens[1:]
+    streets = iter((FLOP, TURN, RIVER))
+    for token in tokens:
+        opcode = SHORT_OPCODES.get(token)
+        if opcode is not None:
+            compiled.append(opcode)
+        elif token[0] in "br" and token[1:].isdigit():
+            opcode = BET if token[0] == "b" else RAISE
+            compiled.append(opcode, NO_PLAYER, _check_amount(int(token[1:]), ACTION_TYPES[opcode]))
+        else:
+            cards = parse_cards(token)
+            opcode = next(streets, None)
+            if opcode is None or len(cards) != BOARD_CARD_COUNTS[opcode]:
+                raise ValueError(f"Invalid board in action sequence: {token}")
+            compiled.append(opcode, NO_PLAYER, pack_cards(cards))
+    return compiled
+
+def format_action_sequence(compiled: CompiledActions) -> str:
+    """Render compiled actions in the short "fff:c:b40:5c6c7c" notation, board cards in place."""
+    tokens = ["fff"]
+    for opcode, _, arg in compiled:
+        if opcode in BOARD_CARD_COUNTS:
+            tokens.append("".join(card_to_str(card) for card in unpack_cards(arg, BOARD_CARD_COUNTS[opcode])))
+        elif opcode == BET:
+            tokens.append(f"b{arg}")
+        elif opcode == RAISE:
+            tokens.append(f"r{arg}")
+        else:
+            tokens.append(SHORT_TOKENS[opcode])
+    return ":".join(tokens)
+
+def to_action(opcode: int, player: int, arg: int) -> Dict:
+    """Expand one compiled action into the JSON action format."""
+    action: Dict = {"type": ACTION_TYPES[opcode]}
+    if opcode in BOARD_CARD_COUNTS:
+        action["cards"] = "".join(card_to_str(card) for card in unpack_cards(arg, BOARD_CARD_COUNTS[opcode]))
+    else:
+        if player != NO_PLAYER:
+            action["player"] = f"P{player + 1}"
+        if opcode in (BET, RAISE) or (opcode == ALLIN and arg):
+            action["amount"] = arg
+    return action
+
+def to_actions(compiled: CompiledActions) -> List[Dict]:
+    """Expand compiled actions back into the JSON action list format."""
+    return [to_action(opcode, player, arg) for opcode, player, arg in compiled]
+
+# Streets, indexed by the number of board deals so far, and the board size on each
+STREETS = ("preflop", "flop", "turn", "river")
+STREET_BOARD_SIZES = (0, 3, 4, 5)
+
+# Version of the snapshot documents built by HandReplay; stored documents of another version are rebuilt
+SNAPSHOT_FORMAT_VERSION = 2
+
+class ReplayState:
+    """
+    Betting state after the first `index` actions of a hand: per-seat remaining
+    stacks, chips committed on the current street and over the whole hand, and
+    bitmasks of folded seats and of seats still to act in the betting round.
+    `last_raise` is the size of the last full bet or raise, the minimum increment
+    for the next raise.
+    """
+
+    __slots__ = (
+        "index", "street", "current_bet", "last_raise", "last_actor", "folded", "to_act", "board",
+        "remaining", "committed", "contributed"
+    )
+
+    def __init__(
+        self,
+        index: int,
+        street: int,
+        current_bet: int,
+        last_raise: int,
+        last_actor: int,
+        folded: int,
+        to_act: int,
+        board: List[int],
+        remaining: List[int],
+        committed: List[int],
+        contributed: List[int]
+    ):
+        self.index = index
+        self.street = street
+        self.current_bet = current_bet
+        self.last_raise = last_raise
+        self.last_actor = last_actor
+        self.folded = folded
+        self.to_act = to_act
+        self.board = board
+        self.remaining = remaining
+        self.committed = committed
+        self.contributed = contributed
+
+    def copy(self) -> "ReplayState":
+        return ReplayState(
+            self.index, self.street, self.current_bet, self.last_raise, self.last_actor, self.folded, self.to_act,
+            self.board[:], self.remaining[:], self.committed[:], self.contributed[:]
+        )
+
+    @property
+    def live_players(self) -> int:
+        return len(self.remaining) - bin(self.folded).count("1")
+
+    def is_folded(self, seat: int) -> bool:
+        return bool(self.folded >> seat & 1)
+
+    def to_row(self) -> List[int]:
+        """Flatten to ints: the scalar fields, packed board, then the per-seat columns."""
+        return [
+            self.index, self.street, self.current_bet, self.last_raise, self.last_actor, self.folded, self.to_act,
+            pack_cards(self.board), *self.remaining, *self.committed, *self.contributed
+        ]
+
+    @classmethod
+    def from_row(cls, row: Sequence[int], player_count: int) -> "ReplayState":
+        if len(row) != 8 + 3 * player_count:
+            raise ValueError("Snapshot does not match the number of players")
+        index, street, current_bet, last_raise, last_actor, folded, to_act, board = row[:8]
+        n = player_count
+        return cls(
+            index, street, current_bet, last_raise, last_actor, folded, to_act,
+            unpack_cards(board, STREET_BOARD_SIZES[street]),
+            list(row[8:8 + n]), list(row[8 + n:8 + 2 * n]), list(row[8 + 2 * n:])
+        )
+
+class HandReplay:
+    """
+    Replays a compiled hand's betting one action at a time, checking legality.
+
+    Bets and raises are "to" amounts. Players must act in turn; an action that
+    names no player is taken by the seat whose turn it is. A street can only be
+    dealt once its betting round is closed, raises must be at least the previous
+    bet or raise (an all-in for less is allowed but doesn't reopen the betting),
+    and under pot-limit betting no bet may exceed the pot.
+
+    A full pass records a snapshot before the first action and just after each
+    street's board cards are dealt. `state_at` resumes from the nearest snapshot
+    at or before the requested index instead of replaying from action 0; the
+    snapshots can be stored with the hand (`snapshot_document`) and passed back in.
+    """
+
+    def __init__(
+        self,
+        compiled: CompiledActions,
+        stacks: Sequence[int],
+        dealer_position: int,
+        small_blind_position: int,
+        big_blind_position: int,
+        small_blind: int = 20,
+        big_blind: int = 40,
+        min_bet: int = 20,
+        betting: str = NO_LIMIT,
+        snapshot_document: Optional[Dict] = None
+    ):
+        if betting not in (NO_LIMIT, POT_LIMIT):
+            raise ValueError(f"Unknown betting structure: {betting}")
+        self.compiled = compiled
+        self.stacks = list(stacks)
+        self.player_count = len(stacks)
+        self.dealer_position = dealer_position
+        self.small_blind_position = small_blind_position
+        self.big_blind_position = big_blind_position
+        self.small_blind = small_blind
+        self.big_blind = big_blind
+        self.min_bet = min_bet
+        self.betting = betting
+        self._snapshots: Optional[List[ReplayState]] = None
+        if snapshot_document and snapshot_document.get("version") == SNAPSHOT_FORMAT_VERSION:
+            self._snapshots = [ReplayState.from_row(row, self.player_count) for row in snapshot_document["rows"]]
+
+    def _open_round(self, state: ReplayState) -> None:
+        # Everyone who can still bet has to act, unless at most one such player is left with nothing to call
+        can_act = [
+            seat for seat in range(self.player_count)
+            if not state.is_folded(seat) and state.remaining[seat] > 0
+        ]
+        if len(can_act) == 1 and state.committed[can_act[0]] >= state.current_bet:
+            can_act = []
+        state.to_act = sum(1 << seat for seat in can_act)
+
+    def initial_state(self) -> ReplayState:
+        remaining = list(self.stacks)
+        committed = [0] * self.player_count
+        for seat, blind in ((self.small_blind_position, self.small_blind), (self.big_blind_position, self.big_blind)):
+            posted = min(blind, remaining[seat])
+            remaining[seat] -= posted
+            committed[seat] += posted
+        state = ReplayState(
+            0, 0, max(committed), self.big_blind, self.big_blind_position, 0, 0, [], remaining, committed, committed[:]
+        )
+        self._open_round(state)
+        return state
+
+    def next_actor(self, state: ReplayState, after: int) -> int:
+        """The first seat after `after` that still has to act in this betting round."""
+        for step in range(1, self.player_count + 1):
+            seat = (after + step) % self.player_count
+            if state.to_act >> seat & 1:
+                return seat
+        return NO_PLAYER
+
+    def max_bet(self, state: ReplayState, seat: int) -> int:
+        """Largest "to" amount `seat` may bet or raise to."""
+        all_in = state.committed[seat] + state.remaining[seat]
+        if self.betting == NO_LIMIT:
+            return all_in
+        # Pot-limit: call, then raise by the size of the pot after the call
+        to_call = state.current_bet - state.committed[seat]
+        return min(all_in, state.current_bet + sum(state.contributed) + to_call)
+
+    def apply(self, state: ReplayState, opcode: int, player: int, amount: int) -> None:
+        """
+        Apply the next action to `state` in place.
+
+        Raises:
+            ValueError: If the action is illegal.
+        """
+        index = state.index
+        state.index += 1
+        if opcode in BOARD_CARD_COUNTS:
+            if opcode != FLOP + state.street:
+                raise ValueError(f"Action {index}: {ACTION_TYPES[opcode]} dealt out of order")
+            if state.to_act and state.live_players > 1:
+                raise ValueError(f"Action {index}: {ACTION_TYPES[opcode]} dealt before the betting round closed")
+            cards = unpack_cards(amount, BOARD_CARD_COUNTS[opcode])
+            if len(set(state.board + cards)) != len(state.board) + len(cards):
+                raise ValueError(f"Action {index}: duplicate community card")
+            state.board.extend(cards)
+            state.street += 1
+            state.committed = [0] * self.player_count
+            state.current_bet = 0
+            state.last_raise = self.big_blind
+            state.last_actor = self.dealer_position
+            self._open_round(state)
+            return
+
+        if state.live_players < 2:
+            raise ValueError(f"Action {index}: the hand is already over")
+        expected = self.next_actor(state, state.last_actor)
+        if expected == NO_PLAYER:
+            raise ValueError(f"Action {index}: the betting round is closed")
+        seat = player if player != NO_PLAYER else expected
+        if not (0 <= seat < self.player_count):
+            raise ValueError(f"Action {index}: invalid player index: {seat + 1}")
+        if state.is_folded(seat):
+            raise ValueError(f"Action {index}: P{seat + 1} has already folded")
+        if state.remaining[seat] == 0:
+            raise ValueError(f"Action {index}: P{seat + 1} is all-in and cannot act")
+        if seat != expected:
+            raise ValueError(f"Action {index}: P{seat + 1} acted out of turn (P{expected + 1} to act)")
+
+        committed = state.committed
+        paid = 0
+        if opcode == FOLD:
+            state.folded |= 1 << seat
+        elif opcode == CHECK:
+            if state.current_bet > committed[seat]:
+                raise ValueError(f"Action {index}: cannot check with an active bet")
+        elif opcode == CALL:
+            if state.current_bet <= committed[seat]:
+                raise ValueError(f"Action {index}: cannot call with no additional bet required")
+            paid = min(state.current_bet - committed[seat], state.remaining[seat])
+        elif opcode in (BET, RAISE):
+            name = ACTION_TYPES[opcode]
+            if amount < self.min_bet or amount <= state.current_bet:
+                raise ValueError(f"Action {index}: invalid {name} amount: {amount}")
+            if amount - committed[seat] > state.remaining[seat]:
+                raise ValueError(f"Action {index}: {name} of {amount} exceeds P{seat + 1}'s stack")
+            is_all_in = amount - committed[seat] == state.remaining[seat]
+            if state.current_bet and amount - state.current_bet < state.last_raise and not is_all_in:
+                raise ValueError(
+                    f"Action {index}: {name} to {amount} is below the minimum raise to {state.current_bet + state.last_raise}"
+                )
+            if amount > self.max_bet(state, seat):
+                raise ValueError(f"Action {index}: {name} to {amount} exceeds the pot limit of {self.max_bet(state, seat)}")
+            paid = amount - committed[seat]
+        elif opcode == ALLIN:
+            if committed[seat] + state.remaining[seat] > self.max_bet(state, seat):
+                raise ValueError(f"Action {index}: all-in exceeds the pot limit of {self.max_bet(state, seat)}")
+            paid = state.remaining[seat]
+
+        state.remaining[seat] -= paid
+        committed[seat] += paid
+        state.contributed[seat] += paid
+        state.to_act &= ~(1 << seat)
+        if committed[seat] > state.current_bet:
+            raise_size = committed[seat] - state.current_bet
+            # Everyone still in with chips must respond to the new bet; only a full raise
+            # resets the minimum raise increment
+            if raise_size >= state.last_raise:
+                state.last_raise = raise_size
+            state.current_bet = committed[seat]
+            for other in range(self.player_count):
+                if other != seat and not state.is_folded(other) and state.remaining[other] > 0:
+                    state.to_act |= 1 << other
+        if state.live_players < 2:
+            state.to_act = 0
+        elif state.to_act:
+            # A lone player with chips left owes nothing more once everyone else is all-in and matched
+            others_can_act = any(
+                not state.is_folded(other) and state.remaining[other] > 0
+                for other in range(self.player_count) if not state.to_act >> other & 1
+            )
+            pending = [other for other in range(self.player_count) if state.to_act >> other & 1]
+            if len(pending) == 1 and not others_can_act and committed[pending[0]] >= state.current_bet:
+                state.to_act = 0
+        state.last_actor = seat
+
+    def snapshots(self) -> List[ReplayState]:
+        """Street-boundary snapshots, from a full (validating) pass on first use."""
+        if self._snapshots is None:
+            state = self.initial_state()
+            snapshots = [state.copy()]
+            for opcode, player, amount in self.compiled:
+                self.apply(state, opcode, player, amount)
+                if opcode in BOARD_CARD_COUNTS:
+                    snapshots.append(state.copy())
+            self._snapshots = snapshots
+        return self._snapshots
+
+    def snapshot_document(self) -> Dict:
+        """The snapshots as a compact JSON-serializable document for storage with the hand."""
+        return {"version": SNAPSHOT_FORMAT_VERSION, "rows": [snapshot.to_row() for snapshot in self.snapshots()]}
+
+    def state_at(self, index: int) -> ReplayState:
+        """
+        State after the first `index` actions, resumed from the nearest snapshot.
+
+        Raises:
+            ValueError: If `index` is out of range or a replayed action is illegal.
+        """
+        if not (0 <= index <= len(self.compiled)):
+            raise ValueError(f"Action index must be between 0 and {len(self.compiled)}")
+        snapshots = self.snapshots()
+        nearest = bisect_right([snapshot.index for snapshot in snapshots], index) - 1
+        state = snapshots[nearest].copy()
+        for i in range(state.index, index):
+            self.apply(state, *self.compiled[i])
+        return state
+
+    def describe(self, state: ReplayState) -> Dict:
+        """The state as the JSON served by the hand state API."""
+        hand_over = state.live_players < 2
+        to_act = NO_PLAYER if hand_over else self.next_actor(state, state.last_actor)
+        return {
+            "at": state.index,
+            "action_count": len(self.compiled),
+            "street": STREETS[state.street],
+            "board": [card_to_str(card) for card in state.board],
+            "pot": sum(state.contributed),
+            "current_bet": state.current_bet,
+            "last_action": to_action(*self.compiled[state.index - 1]) if state.index else None,
+            "to_act": f"P{to_act + 1}" if to_act != NO_PLAYER else None,
+            "hand_over": hand_over,
+            "players": [
+                {
+                    "player": f"P{seat + 1}",
+                    "stack": state.remaining[seat],
+                    "committed": state.committed[seat],
+                    "contributed": state.contributed[seat],
+                    "folded": state.is_folded(seat)
+                }
+                for seat in range(self.player_count)
+            ]
+        }
+
+def validate_actions(
+    compiled: CompiledActions,
+    stacks: Sequence[int],
+    dealer_position: int,
+    small_blind_position: int,
+    big_blind_position: int,
+    small_blind: int = 20,
+    big_blind: int = 40,
+    min_bet: int = 20,
+    betting: str = NO_LIMIT
+) -> Dict:
+    """
+    Check betting legality of a whole hand in a single pass over the opcodes.
+
+    Returns:
+        The street snapshots recorded on the way, as a HandReplay snapshot document.
+
+    Raises:
+        ValueError: On the first illegal action.
+    """
+    replay = HandReplay(
+        compiled, stacks, dealer_position, small_blind_position, big_blind_position,
+        small_blind=small_blind, big_blind=big_blind, min_bet=min_bet, betting=betting
+    )
+    return replay.snapshot_document()
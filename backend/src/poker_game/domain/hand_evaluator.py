@@ -0,0 +1,249 @@
+# backend/src/poker_game/domain/hand_evaluator.py
+from collections import OrderedDict
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import os
+import threading
+from .shared_tables import SharedRankTableStore
+
+RANKS = "23456789TJQKA"
+SUITS = "cdhs"
+
+# Hand categories, encoded in the top bits of a score (higher score wins)
+HIGH_CARD, PAIR, TWO_PAIR, TRIPS, STRAIGHT, FLUSH, FULL_HOUSE, QUADS, STRAIGHT_FLUSH = range(9)
+
+def parse_card(card: str) -> int:
+    """
+    Convert a card string such as "As" or "Td" to an index 0-51 (rank * 4 + suit).
+
+    Raises:
+        ValueError: If the card string is malformed.
+    """
+    if len(card) != 2 or card[0] not in RANKS or card[1] not in SUITS:
+        raise ValueError(f"Invalid card: {card}")
+    return RANKS.index(card[0]) * 4 + SUITS.index(card[1])
+
+def parse_cards(cards: str) -> List[int]:
+    """Parse a run of cards, with or without separators, e.g. "3hKdQs" or "3h Kd Qs"."""
+    compact = "".join(cards.split())
+    if len(compact) % 2:
+        raise ValueError(f"Invalid card string: {cards}")
+    return [parse_card(compact[i:i + 2]) for i in range(0, len(compact), 2)]
+
+def card_to_str(card: int) -> str:
+    return RANKS[card >> 2] + SUITS[card & 3]
+
+# All 1326 two-card combos, ordered so that COMBOS[i] = (low card, high card)
+COMBOS: List[Tuple[int, int]] = list(combinations(range(52), 2))
+COMBO_INDEX = {combo: i for i, combo in enumerate(COMBOS)}
+COMBO_COUNT = len(COMBOS)
+
+# Per-card bitsets over the 1326 combos, used for bulk card-removal
+CARD_COMBO_MASKS: List[int] = [0] * 52
+for _i, (_a, _b) in enumerate(COMBOS):
+    CARD_COMBO_MASKS[_a] |= 1 << _i
+    CARD_COMBO_MASKS[_b] |= 1 << _i
+
+def combo_index(a: int, b: int) -> int:
+    return COMBO_INDEX[(a, b) if a < b else (b, a)]
+
+def dead_combo_mask(cards: Iterable[int]) -> int:
+    """Bitset of every combo that shares a card with `cards`."""
+    mask = 0
+    for card in cards:
+        mask |= CARD_COMBO_MASKS[card]
+    return mask
+
+def _straight_high(rank_mask: int) -> int:
+    # Highest rank of a 5-card straight in a 13-bit rank mask, or -1 (ace plays low in the wheel)
+    extended = (rank_mask << 1) | (rank_mask >> 12 & 1)
+    for high in range(13, 3, -1):
+        if (extended >> (high - 4)) & 0b11111 == 0b11111:
+            return high - 1
+    return -1
+
+# 13-bit rank mask lookup tables, built once at import
+POPCOUNT: List[int] = [bin(m).count("1") for m in range(1 << 13)]
+STRAIGHT_HIGH: List[int] = [_straight_high(m) for m in range(1 << 13)]
+
+def _top_ranks(rank_mask: int, n: int) -> List[int]:
+    ranks = []
+    for r in range(12, -1, -1):
+        if rank_mask >> r & 1:
+            ranks.append(r)
+            if len(ranks) == n:
+                break
+    return ranks
+
+def _score(category: int, ranks: Sequence[int]) -> int:
+    score = category
+    for i in range(5):
+        score = (score << 4) | (ranks[i] if i < len(ranks) else 0)
+    return score
+
+def evaluate(cards: Sequence[int]) -> int:
+    """
+    Score the best 5-card hand out of 5-7 cards. Higher scores win; equal scores tie.
+    """
+    counts = [0] * 13
+    suit_masks = [0, 0, 0, 0]
+    for card in cards:
+        counts[card >> 2] += 1
+        suit_masks[card & 3] |= 1 << (card >> 2)
+    return _score_state(counts, suit_masks)
+
+def _score_state(counts: List[int], suit_masks: List[int]) -> int:
+    # Score from per-rank counts and per-suit rank masks
+    for suit_mask in suit_masks:
+        if POPCOUNT[suit_mask] >= 5:
+            high = STRAIGHT_HIGH[suit_mask]
+            if high >= 0:
+                return _score(STRAIGHT_FLUSH, (high,))
+            return _score(FLUSH, _top_ranks(suit_mask, 5))
+
+    rank_mask = suit_masks[0] | suit_masks[1] | suit_masks[2] | suit_masks[3]
+    quads, trips, pairs = -1, [], []
+    for r in range(12, -1, -1):
+        count = counts[r]
+        if count == 4:
+            quads = r
+        elif count == 3:
+            trips.append(r)
+        elif count == 2:
+            pairs.append(r)
+
+    if quads >= 0:
+        return _score(QUADS, [quads] + _top_ranks(rank_mask & ~(1 << quads), 1))
+    if trips and (len(trips) > 1 or pairs):
+        # A second set of trips counts as the pair of a full house
+        pair = max(trips[1] if len(trips) > 1 else -1, pairs[0] if pairs else -1)
+        return _score(FULL_HOUSE, (trips[0], pair))
+    high = STRAIGHT_HIGH[rank_mask]
+    if high >= 0:
+        return _score(STRAIGHT, (high,))
+    if trips:
+        return _score(TRIPS, [trips[0]] + _top_ranks(rank_mask & ~(1 << trips[0]), 2))
+    if len(pairs) >= 2:
+        kicker_mask = rank_mask & ~(1 << pairs[0]) & ~(1 << pairs[1])
+        return _score(TWO_PAIR, [pairs[0], pairs[1]] + _top_ranks(kicker_mask, 1))
+    if pairs:
+        return _score(PAIR, [pairs[0]] + _top_ranks(rank_mask & ~(1 << pairs[0]), 3))
+    return _score(HIGH_CARD, _top_ranks(rank_mask, 5))
+
+class BoardRankCache:
+    """
+    LRU cache of per-board rank tables: the score of each of the 1326 hole-card
+    combos against a complete 5-card board.
+
+    The board's rank counts and suit masks are computed once per table and only
+    the two hole cards are added per combo, so a miss costs one pass over the
+    combos and a hit costs a dictionary lookup. Safe to share between the event
+    loop and executor threads.
+
+    With a `shared` store (multi-worker mode) the LRU is a small per-process
+    front for the store: misses are looked up there before being built, and
+    built tables are published for the other workers.
+    """
+
+    def __init__(self, maxsize: int = 256, shared: Optional[SharedRankTableStore] = None):
+        if maxsize < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.maxsize = maxsize
+        self.shared = shared
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+        self._tables: "OrderedDict[Tuple[int, ...], Tuple[int, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, board: Sequence[int]) -> Tuple[int, ...]:
+        """Return the rank table for a board (cards in any order); conflicting combos score -1."""
+        key = tuple(sorted(board))
+        if len(key) != 5 or len(set(key)) != 5:
+            raise ValueError("A rank table needs a complete board of 5 distinct cards")
+        with self._lock:
+            table = self._tables.get(key)
+            if table is not None:
+                self._tables.move_to_end(key)
+                self.hits += 1
+                return table
+            self.misses += 1
+
+        table = None
+        if self.shared is not None:
+            stored = self.shared.get(key)
+            if stored is not None:
+                table = tuple(stored)
+                with self._lock:
+                    self.shared_hits += 1
+        if table is None:
+            table = _build_rank_table(key)
+            if self.shared is not None:
+                self.shared.put(key, table)
+        with self._lock:
+            self._tables[key] = table
+            self._tables.move_to_end(key)
+            while len(self._tables) > self.maxsize:
+                self._tables.popitem(last=False)
+        return table
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "shared_hits": self.shared_hits,
+                "size": len(self._tables),
+                "maxsize": self.maxsize
+            }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+            self.hits = 0
+            self.misses = 0
+            self.shared_hits = 0
+
+def _build_rank_table(board: Tuple[int, ...]) -> Tuple[int, ...]:
+    board_counts = [0] * 13
+    board_suits = [0, 0, 0, 0]
+    for card in board:
+        board_counts[card >> 2] += 1
+        board_suits[card & 3] |= 1 << (card >> 2)
+    dead = set(board)
+
+    table = []
+    for a, b in COMBOS:
+        if a in dead or b in dead:
+            table.append(-1)
+            continue
+        counts = board_counts[:]
+        suit_masks = board_suits[:]
+        counts[a >> 2] += 1
+        counts[b >> 2] += 1
+        suit_masks[a & 3] |= 1 << (a >> 2)
+        suit_masks[b & 3] |= 1 << (b >> 2)
+        table.append(_score_state(counts, suit_masks))
+    return tuple(table)
+
+# Shared process-wide cache used by the equity engine; in multi-worker mode it fronts
+# the store the launcher created before forking. A table takes about 48 KB, so the
+# default 256 boards stay around 12 MB per process
+BOARD_RANK_CACHE = BoardRankCache(
+    maxsize=int(os.getenv("BOARD_RANK_CACHE_SIZE", "256")),
+    shared=SharedRankTableStore.from_env(COMBO_COUNT)
+)
+
+def board_rank_table(board: Sequence[int], cached: bool = True) -> Tuple[int, ...]:
+    """
+    Score every one of the 1326 hole-card combos against a complete 5-card board.
+
+    With `cached=False` the table is built without touching BOARD_RANK_CACHE, for
+    one-off boards (such as random runouts) that would only evict reusable ones.
+    """
+    if cached:
+        return BOARD_RANK_CACHE.get(board)
+    key = tuple(sorted(board))
+    if len(key) != 5 or len(set(key)) != 5:
+        raise ValueError("A rank table needs a complete board of 5 distinct cards")
+    return _build_rank_table(key)
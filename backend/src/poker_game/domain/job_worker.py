@@ -0,0 +1,253 @@
+# backend/src/poker_game/domain/job_worker.py
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+from ..repositories.hand_repository import HandRepository
+from ..repositories.job_repository import JobRepository
+from ..repositories.db_pools import DatabasePools
+from .range_equity import range_vs_range_equity
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# A handler receives the database pools, the job params and a progress callback, and returns the final result
+ProgressCallback = Callable[[float, Optional[Any]], Awaitable[None]]
+JobHandler = Callable[[DatabasePools, Dict[str, Any], ProgressCallback], Awaitable[Any]]
+
+JOB_HANDLERS: Dict[str, JobHandler] = {}
+
+class JobLeaseLost(Exception):
+    """Raised from a job's progress callback once its lease expired and the job was requeued."""
+
+BATCH_SIZE = 500
+
+# Processes for CPU-bound handlers; a thread would hold the GIL and stall the event loop
+JOB_PROCESSES = int(os.getenv("JOB_PROCESSES", "1"))
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """The shared process pool for CPU-bound job handlers, created on first use."""
+    global _process_pool
+    if _process_pool is None:
+        # Spawned, not forked: the parent has an event loop and executor threads running
+        _process_pool = ProcessPoolExecutor(max_workers=JOB_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+    return _process_pool
+
+def shutdown_process_pool() -> None:
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+def register_job(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """Decorator registering a coroutine as the handler for a job kind."""
+    def decorator(handler: JobHandler) -> JobHandler:
+        JOB_HANDLERS[kind] = handler
+        return handler
+    return decorator
+
+def _page_key(hand: Dict) -> Tuple[datetime, UUID]:
+    # Where the next HandRepository.find_page call continues from
+    return datetime.fromisoformat(hand["created_at"]), UUID(hand["id"])
+
+def _load_json(value: Any) -> Any:
+    # asyncpg returns JSONB columns as strings unless a codec is registered
+    return json.loads(value) if isinstance(value, str) else value
+
+@register_job("audit")
+async def audit_hands(pools: DatabasePools, params: Dict[str, Any], report: ProgressCallback) -> Dict:
+    """Check every stored hand for unbalanced winnings or mismatched seat counts."""
+    total = await HandRepository(pools).count()
+
+    checked = 0
+    invalid: List[Dict] = []
+    after = None
+    while checked < total:
+        hands = await HandRepository(pools).find_page(BATCH_SIZE, after)
+        if not hands:
+            break
+        after = _page_key(hands[-1])
+        for hand in hands:
+            winnings = _load_json(hand["winnings"]) or {}
+            stacks = _load_json(hand["stacks"]) or []
+            if sum(winnings.values()) != 0:
+                invalid.append({"id": hand["id"], "reason": "winnings do not balance"})
+            elif winnings and len(winnings) != len(stacks):
+                invalid.append({"id": hand["id"], "reason": "winnings do not match seat count"})
+        checked += len(hands)
+        await report(checked / total, {"checked": checked, "invalid": invalid})
+
+    return {"checked": checked, "invalid": invalid}
+
+@register_job("export")
+async def export_hands(pools: DatabasePools, params: Dict[str, Any], report: ProgressCallback) -> Dict:
+    """Export up to `max_hands` hands (newest first) as a single result document."""
+    max_hands = int(params.get("max_hands", 10000))
+    total = min(await HandRepository(pools).count(), max_hands)
+
+    exported: List[Dict] = []
+    after = None
+    while len(exported) < total:
+        hands = await HandRepository(pools).find_page(min(BATCH_SIZE, total - len(exported)), after)
+        if not hands:
+            break
+        after = _page_key(hands[-1])
+        exported.extend(hands)
+        await report(len(exported) / total, None)
+
+    return {"count": len(exported), "hands": exported}
+
+@register_job("range_equity")
+async def range_equity(pools: DatabasePools, params: Dict[str, Any], report: ProgressCallback) -> Dict:
+    """Range-vs-range equity, e.g. {"hero": "QQ+,AKs", "villain": "22+,A2s+", "board": "2c7d9h"}."""
+    if "hero" not in params or "villain" not in params:
+        raise ValueError("range_equity jobs require 'hero' and 'villain' ranges")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_process_pool(),
+        partial(
+            range_vs_range_equity,
+            params["hero"],
+            params["villain"],
+            params.get("board", ""),
+            samples=int(params.get("samples", 500)),
+            seed=params.get("seed")
+        )
+    )
+
+class JobWorkerPool:
+    """
+    Runs queued jobs from the `jobs` table on a fixed number of asyncio workers.
+
+    The worker count is the concurrency limit; jobs are claimed in priority order.
+    A running job's lease is renewed every third of `lease_timeout`; jobs whose
+    lease lapsed (their process died) are requeued by whichever pool notices first,
+    so several processes can run pools against the same table. A worker whose
+    lease lapsed anyway can no longer update the job: its next progress report
+    stops the handler, and its result or error is dropped.
+    CPU-bound handlers should run their inner loops in `get_process_pool()` so
+    they don't stall the event loop serving HTTP requests.
+    """
+
+    def __init__(
+        self,
+        pools: DatabasePools,
+        concurrency: int = 2,
+        poll_interval: float = 1.0,
+        lease_timeout: float = 60.0
+    ):
+        if concurrency < 1:
+            raise ValueError("Job worker concurrency must be at least 1")
+        if lease_timeout <= 0:
+            raise ValueError("Job lease timeout must be positive")
+        self.pools = pools
+        # Job bookkeeping always goes to the primary
+        self.pool = pools.primary
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+        self.lease_timeout = lease_timeout
+        self._tasks: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    async def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._requeue_stale_jobs()))
+
+    async def stop(self) -> None:
+        self._stopping = True
+        self._wakeup.set()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        shutdown_process_pool()
+
+    def notify(self) -> None:
+        """Wake idle workers immediately instead of waiting for the next poll."""
+        self._wakeup.set()
+
+    async def _requeue_stale_jobs(self) -> None:
+        while not self._stopping:
+            try:
+                async with self.pool.acquire() as conn:
+                    requeued = await JobRepository(conn).requeue_stale(self.lease_timeout)
+                if requeued:
+                    logger.info(f"Requeued {requeued} jobs whose lease expired")
+                    self._wakeup.set()
+            except Exception as e:
+                logger.error(f"Failed to requeue stale jobs: {str(e)}")
+            await asyncio.sleep(self.lease_timeout)
+
+    async def _heartbeat(self, job_id: UUID, started_at: datetime) -> None:
+        while True:
+            await asyncio.sleep(self.lease_timeout / 3)
+            try:
+                async with self.pool.acquire() as conn:
+                    renewed = await JobRepository(conn).heartbeat(job_id, started_at)
+            except Exception as e:
+                logger.error(f"Failed to renew the lease on job {job_id}: {str(e)}")
+                continue
+            if not renewed:
+                logger.warning(f"Lost the lease on job {job_id}")
+                return
+
+    async def _worker(self, worker_id: int) -> None:
+        while not self._stopping:
+            try:
+                async with self.pool.acquire() as conn:
+                    job = await JobRepository(conn).claim_next()
+            except Exception as e:
+                logger.error(f"Job worker {worker_id} failed to claim a job: {str(e)}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run(job)
+
+    async def _run(self, job: Dict) -> None:
+        job_id = UUID(job["id"])
+        # The claim time identifies this run's lease; a requeued and reclaimed job has a new one
+        started_at = datetime.fromisoformat(job["started_at"])
+        handler = JOB_HANDLERS.get(job["kind"])
+
+        async def report(progress: float, partial_result: Optional[Any] = None) -> None:
+            async with self.pool.acquire() as conn:
+                if not await JobRepository(conn).update_progress(job_id, started_at, progress, partial_result):
+                    raise JobLeaseLost(f"Job {job_id} was requeued after its lease expired")
+
+        logger.debug(f"Running job {job_id} ({job['kind']})")
+        heartbeat = asyncio.create_task(self._heartbeat(job_id, started_at))
+        try:
+            if handler is None:
+                raise ValueError(f"Unknown job kind: {job['kind']}")
+            result = await handler(self.pools, job["params"], report)
+            async with self.pool.acquire() as conn:
+                if not await JobRepository(conn).complete(job_id, started_at, result):
+                    logger.warning(f"Discarding the result of job {job_id}: its lease expired")
+        except asyncio.CancelledError:
+            raise
+        except JobLeaseLost as e:
+            logger.warning(f"Stopped job {job_id}: {str(e)}")
+        except Exception as e:
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            async with self.pool.acquire() as conn:
+                if not await JobRepository(conn).fail(job_id, started_at, str(e)):
+                    logger.warning(f"Not recording the failure of job {job_id}: its lease expired")
+        finally:
+            heartbeat.cancel()
@@ -1,5 +1,6 @@
 # backend/src/poker_game/domain/poker_utils.py
 from typing import List, Dict
+from .variants import MIN_PLAYERS, MAX_PLAYERS
 
 def calculate_fallback_winnings(contributions: List[int], winner_idx: int) -> Dict[str, int]:
     """
@@ -7,7 +8,7 @@ def calculate_fallback_winnings(contributions: List[int], winner_idx: int) -> Di
     
     Args:
         contributions: List of integers representing each player's total contribution to the pot.
-        winner_idx: Index of the winning player (0-5).
+        winner_idx: Index of the winning player (0 to len(contributions) - 1).
     
     Returns:
         Dict[str, int]: Dictionary mapping player IDs (e.g., "P1") to their net winnings/losses.
@@ -16,16 +17,17 @@ def calculate_fallback_winnings(contributions: List[int], winner_idx: int) -> Di
         ValueError: If inputs are invalid (e.g., negative contributions, invalid winner_idx).
     """
     # Validate inputs
-    if not isinstance(contributions, list) or len(contributions) != 6:
-        raise ValueError("Contributions must be a list of 6 integers")
+    if not isinstance(contributions, list) or not (MIN_PLAYERS <= len(contributions) <= MAX_PLAYERS):
+        raise ValueError(f"Contributions must be a list of {MIN_PLAYERS} to {MAX_PLAYERS} integers")
+    player_count = len(contributions)
     if not all(isinstance(c, (int, float)) and c >= 0 for c in contributions):
         raise ValueError("All contributions must be non-negative")
-    if not (0 <= winner_idx < 6):
-        raise ValueError("Winner index must be between 0 and 5")
+    if not (0 <= winner_idx < player_count):
+        raise ValueError(f"Winner index must be between 0 and {player_count - 1}")
 
     total_pot = sum(contributions)
     if total_pot == 0:
-        return {f"P{i+1}": 0 for i in range(6)}  # No pot, no winnings/losses
+        return {f"P{i+1}": 0 for i in range(player_count)}  # No pot, no winnings/losses
 
     # Initialize winnings with negative contributions for all players
     winnings = {f"P{i+1}": -contrib for i, contrib in enumerate(contributions)}
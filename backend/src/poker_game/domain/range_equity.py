@@ -0,0 +1,236 @@
+# backend/src/poker_game/domain/range_equity.py
+from itertools import combinations
+from typing import Dict, Iterable, List, Optional, Sequence
+import random
+import re
+from .hand_evaluator import (
+    COMBOS, COMBO_COUNT, RANKS, board_rank_table, card_to_str, combo_index, dead_combo_mask, parse_card, parse_cards
+)
+
+# A range is a list of 1326 combo weights (0.0 - 1.0), indexed like hand_evaluator.COMBOS
+Range = List[float]
+
+_TOKEN = re.compile(
+    r"^(?P<hand>[2-9TJQKA]{2}[so]?|[2-9TJQKA][cdhs][2-9TJQKA][cdhs])"
+    r"(?:(?P<plus>\+)|-(?P<end>[2-9TJQKA]{2}[so]?))?"
+    r"(?::(?P<weight>\d*\.?\d+))?$"
+)
+
+def _hand_combos(high: int, low: int, suitedness: str) -> List[int]:
+    """Combo indices for a hand class such as AKs (high=12, low=11, 's')."""
+    indices = []
+    for s1 in range(4):
+        for s2 in range(4):
+            if high == low and s2 <= s1:
+                continue
+            if suitedness == "s" and s1 != s2:
+                continue
+            if suitedness == "o" and s1 == s2:
+                continue
+            indices.append(combo_index(high * 4 + s1, low * 4 + s2))
+    return indices
+
+def _parse_class(hand: str):
+    high, low = RANKS.index(hand[0]), RANKS.index(hand[1])
+    if high < low:
+        high, low = low, high
+    suitedness = hand[2] if len(hand) == 3 else ""
+    if high == low and suitedness:
+        raise ValueError(f"Pairs cannot be suited or offsuit: {hand}")
+    return high, low, suitedness
+
+def parse_range(text: str) -> Range:
+    """
+    Parse a range in common notation into 1326 combo weights.
+
+    Supports pairs and hand classes ("QQ", "AKs", "AKo", "AK"), "+" ("QQ+", "A2s+"),
+    dash spans ("22-55", "A2s-A5s"), exact combos ("AsKs") and weights ("AKs:0.5").
+
+    Raises:
+        ValueError: If a token cannot be parsed.
+    """
+    weights = [0.0] * COMBO_COUNT
+    for raw_token in text.split(","):
+        token = raw_token.strip()
+        if not token:
+            continue
+        match = _TOKEN.match(token)
+        if not match:
+            raise ValueError(f"Invalid range token: {token}")
+        weight = float(match.group("weight")) if match.group("weight") else 1.0
+        if not (0.0 <= weight <= 1.0):
+            raise ValueError(f"Range weight must be between 0 and 1: {token}")
+        hand = match.group("hand")
+
+        if len(hand) == 4:
+            if match.group("plus") or match.group("end"):
+                raise ValueError(f"Exact combos cannot be extended: {token}")
+            a, b = parse_card(hand[:2]), parse_card(hand[2:])
+            if a == b:
+                raise ValueError(f"Duplicate card in combo: {token}")
+            weights[combo_index(a, b)] = weight
+            continue
+
+        high, low, suitedness = _parse_class(hand)
+        if match.group("plus"):
+            if high == low:
+                classes = [(r, r) for r in range(high, 13)]
+            else:
+                classes = [(high, r) for r in range(low, high)]
+        elif match.group("end"):
+            end_high, end_low, end_suitedness = _parse_class(match.group("end"))
+            if end_suitedness != suitedness or (high == low) != (end_high == end_low):
+                raise ValueError(f"Range span endpoints must be the same kind of hand: {token}")
+            if high == low:
+                classes = [(r, r) for r in range(min(high, end_high), max(high, end_high) + 1)]
+            elif high == end_high:
+                classes = [(high, r) for r in range(min(low, end_low), max(low, end_low) + 1)]
+            else:
+                raise ValueError(f"Range span must keep the same top card: {token}")
+        else:
+            classes = [(high, low)]
+
+        for class_high, class_low in classes:
+            for index in _hand_combos(class_high, class_low, suitedness):
+                weights[index] = weight
+    return weights
+
+def combo_mask(weights: Range) -> int:
+    """Bitset of the combos with non-zero weight."""
+    mask = 0
+    for i, w in enumerate(weights):
+        if w:
+            mask |= 1 << i
+    return mask
+
+def remove_dead_cards(weights: Range, dead_cards: Iterable[int]) -> Range:
+    """Zero out every combo that shares a card with `dead_cards`, in one bitset pass."""
+    live = combo_mask(weights) & ~dead_combo_mask(dead_cards)
+    result = [0.0] * COMBO_COUNT
+    while live:
+        low_bit = live & -live
+        i = low_bit.bit_length() - 1
+        result[i] = weights[i]
+        live ^= low_bit
+    return result
+
+def _showdown_totals(hero: Range, villain: Range, ranks: Sequence[int]):
+    """
+    Weighted win/tie/total counts of hero vs villain on one complete board.
+
+    Combos are swept once in score order; card conflicts between the two hands
+    are removed by inclusion-exclusion on per-card running sums instead of
+    comparing every hero combo with every villain combo.
+    """
+    order = sorted((i for i in range(COMBO_COUNT) if ranks[i] >= 0 and (hero[i] or villain[i])),
+                   key=ranks.__getitem__)
+    less_total = 0.0
+    less_card = [0.0] * 52
+    all_total = 0.0
+    all_card = [0.0] * 52
+    for i in order:
+        w = villain[i]
+        if w:
+            a, b = COMBOS[i]
+            all_total += w
+            all_card[a] += w
+            all_card[b] += w
+
+    win = tie = total = 0.0
+    start = 0
+    while start < len(order):
+        score = ranks[order[start]]
+        end = start
+        eq_total = 0.0
+        eq_card: Dict[int, float] = {}
+        while end < len(order) and ranks[order[end]] == score:
+            i = order[end]
+            w = villain[i]
+            if w:
+                a, b = COMBOS[i]
+                eq_total += w
+                eq_card[a] = eq_card.get(a, 0.0) + w
+                eq_card[b] = eq_card.get(b, 0.0) + w
+            end += 1
+
+        for i in order[start:end]:
+            h = hero[i]
+            if not h:
+                continue
+            a, b = COMBOS[i]
+            own = villain[i]
+            win += h * (less_total - less_card[a] - less_card[b])
+            tie += h * (eq_total - eq_card.get(a, 0.0) - eq_card.get(b, 0.0) + own)
+            total += h * (all_total - all_card[a] - all_card[b] + own)
+
+        for i in order[start:end]:
+            w = villain[i]
+            if w:
+                a, b = COMBOS[i]
+                less_total += w
+                less_card[a] += w
+                less_card[b] += w
+        start = end
+    return win, tie, total
+
+def range_vs_range_equity(
+    hero: str,
+    villain: str,
+    board: str = "",
+    exhaustive_limit: int = 1176,
+    samples: int = 500,
+    seed: Optional[int] = None
+) -> Dict:
+    """
+    Compute hero's all-in equity against villain on a board of 0, 3, 4 or 5 cards.
+
+    Runouts are enumerated when there are at most `exhaustive_limit` of them (every
+    flop, turn and river board by default), otherwise `samples` runouts are drawn at random.
+
+    Raises:
+        ValueError: If a range or the board is invalid, or the ranges do not overlap any runout.
+    """
+    board_cards = parse_cards(board)
+    if len(board_cards) not in (0, 3, 4, 5) or len(set(board_cards)) != len(board_cards):
+        raise ValueError("Board must have 0, 3, 4 or 5 distinct cards")
+    hero_weights = remove_dead_cards(parse_range(hero), board_cards)
+    villain_weights = remove_dead_cards(parse_range(villain), board_cards)
+
+    missing = 5 - len(board_cards)
+    deck = [c for c in range(52) if c not in board_cards]
+    runout_count = 1
+    for k in range(missing):
+        runout_count = runout_count * (len(deck) - k) // (k + 1)
+
+    if runout_count <= exhaustive_limit:
+        runouts: Iterable = combinations(deck, missing)
+        exhaustive = True
+    else:
+        rng = random.Random(seed)
+        runouts = (rng.sample(deck, missing) for _ in range(samples))
+        exhaustive = False
+
+    # Only a complete board from the request is worth caching; runout boards rarely repeat
+    # across requests and would evict the ones that do
+    win = tie = total = 0.0
+    evaluated = 0
+    for runout in runouts:
+        full_board = tuple(sorted(board_cards + list(runout)))
+        ranks = board_rank_table(full_board, cached=not missing)
+        w, t, n = _showdown_totals(hero_weights, villain_weights, ranks)
+        win += w
+        tie += t
+        total += n
+        evaluated += 1
+
+    if total == 0:
+        raise ValueError("Ranges have no non-conflicting combos on this board")
+    equity = (win + tie / 2) / total
+    return {
+        "hero_equity": equity,
+        "villain_equity": 1 - equity,
+        "tie_rate": tie / total,
+        "runouts": evaluated,
+        "exhaustive": exhaustive,
+        "board": [card_to_str(c) for c in board_cards],
+    }
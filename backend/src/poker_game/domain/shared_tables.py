@@ -0,0 +1,141 @@
+# backend/src/poker_game/domain/shared_tables.py
+from array import array
+from typing import Optional, Sequence
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import threading
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Path of the shared rank-table store; set by the multi-worker launcher before it forks
+SHARED_RANK_STORE_ENV = "POKER_SHARED_RANK_STORE"
+
+# File header: magic, format version, slot count, entries per table
+_HEADER = struct.Struct("<4sIII")
+_MAGIC = b"PKRT"
+_VERSION = 1
+# Slot header: the packed board key (0 marks an empty slot)
+_SLOT_KEY = struct.Struct("<Q")
+
+def pack_board(board: Sequence[int]) -> int:
+    """Pack up to 10 sorted card indexes (0-51) into a non-zero 64-bit key."""
+    key = 0
+    for card in board:
+        key = (key << 6) | (card + 1)
+    return key
+
+class SharedRankTableStore:
+    """
+    Fixed-size, direct-mapped store of rank tables in a memory-mapped file.
+
+    Every process maps the same file, so a table built by one process is reused
+    by the others and the tables occupy one copy of memory however many processes
+    run. The store starts empty and fills as tables are built. Each board hashes
+    to a single slot; a newer table evicts whatever occupied it. Slots are
+    guarded by POSIX byte-range locks (shared for reads, exclusive for writes)
+    across processes, and a thread lock within a process, since byte-range
+    locks are held per process.
+    """
+
+    def __init__(self, path: str, mapping: mmap.mmap, fd: int, slots: int, entries: int):
+        self.path = path
+        self.slots = slots
+        self.entries = entries
+        self.hits = 0
+        self.misses = 0
+        self._mmap = mapping
+        self._fd = fd
+        self._table_bytes = entries * array("i").itemsize
+        self._slot_size = _SLOT_KEY.size + self._table_bytes
+        self._lock = threading.Lock()
+
+    @classmethod
+    def create(cls, path: str, slots: int, entries: int) -> "SharedRankTableStore":
+        """Create (or truncate) the store file with every slot empty, then attach to it."""
+        if slots < 1:
+            raise ValueError("Store needs at least one slot")
+        slot_size = _SLOT_KEY.size + entries * array("i").itemsize
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # Build under a temporary name so workers never attach to a half-written file
+        temp_path = f"{path}.tmp"
+        with open(temp_path, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, _VERSION, slots, entries))
+            f.truncate(_HEADER.size + slots * slot_size)
+        os.replace(temp_path, path)
+        logger.info(f"Created shared rank table store at {path}: {slots} slots, {(_HEADER.size + slots * slot_size) >> 20} MiB")
+        return cls.attach(path, entries)
+
+    @classmethod
+    def attach(cls, path: str, entries: int) -> "SharedRankTableStore":
+        fd = os.open(path, os.O_RDWR)
+        try:
+            mapping = mmap.mmap(fd, 0, mmap.MAP_SHARED, mmap.PROT_READ | mmap.PROT_WRITE)
+        except Exception:
+            os.close(fd)
+            raise
+        magic, version, slots, stored_entries = _HEADER.unpack_from(mapping, 0)
+        if magic != _MAGIC or version != _VERSION or stored_entries != entries:
+            mapping.close()
+            os.close(fd)
+            raise ValueError(f"Incompatible rank table store at {path}")
+        return cls(path, mapping, fd, slots, entries)
+
+    @classmethod
+    def from_env(cls, entries: int) -> Optional["SharedRankTableStore"]:
+        """Attach to the store named by POKER_SHARED_RANK_STORE, if set."""
+        path = os.getenv(SHARED_RANK_STORE_ENV)
+        if not path:
+            return None
+        try:
+            return cls.attach(path, entries)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Shared rank table store unavailable, using per-process cache only: {str(e)}")
+            return None
+
+    def _slot_offset(self, key: int) -> int:
+        # Fibonacci hashing spreads the packed card bits over the slots
+        slot = ((key * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> 32
+        return _HEADER.size + (slot % self.slots) * self._slot_size
+
+    def get(self, board: Sequence[int]) -> Optional[array]:
+        """Return a copy of the stored table for a sorted board, or None."""
+        key = pack_board(board)
+        offset = self._slot_offset(key)
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_SH, self._slot_size, offset)
+            try:
+                if _SLOT_KEY.unpack_from(self._mmap, offset)[0] != key:
+                    self.misses += 1
+                    return None
+                start = offset + _SLOT_KEY.size
+                data = self._mmap[start:start + self._table_bytes]
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self._slot_size, offset)
+            self.hits += 1
+        table = array("i")
+        table.frombytes(data)
+        return table
+
+    def put(self, board: Sequence[int], table: Sequence[int]) -> None:
+        if len(table) != self.entries:
+            raise ValueError(f"Expected a table of {self.entries} entries, got {len(table)}")
+        key = pack_board(board)
+        offset = self._slot_offset(key)
+        data = array("i", table).tobytes()
+        with self._lock:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, self._slot_size, offset)
+            try:
+                start = offset + _SLOT_KEY.size
+                self._mmap[start:start + self._table_bytes] = data
+                _SLOT_KEY.pack_into(self._mmap, offset, key)
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, self._slot_size, offset)
+
+    def close(self) -> None:
+        self._mmap.close()
+        os.close(self._fd)
@@ -0,0 +1,147 @@
+# backend/tests/poker_game/domain/test_action_log.py
+import pytest
+from src.poker_game.domain.action_log import (
+    MAX_AMOUNT, SNAPSHOT_FORMAT_VERSION, HandReplay, compile_actions, format_action_sequence, parse_action_sequence,
+    to_actions, validate_actions
+)
+from src.poker_game.domain.poker_service import PokerService
+from src.poker_game.domain.variants import POT_LIMIT
+
+ACTIONS = [
+    {"type": "call", "player": "P4"},
+    {"type": "fold", "player": "P5"},
+    {"type": "fold", "player": "P6"},
+    {"type": "fold", "player": "P1"},
+    {"type": "call", "player": "P2"},
+    {"type": "check", "player": "P3"},
+    {"type": "flop", "cards": "3hKdQs"},
+    {"type": "bet", "player": "P2", "amount": 80},
+    {"type": "raise", "player": "P3", "amount": 200},
+    {"type": "fold", "player": "P4"},
+    {"type": "call", "player": "P2"},
+    {"type": "turn", "cards": "7c"},
+]
+
+def test_compile_round_trips_both_formats():
+    compiled = compile_actions(ACTIONS)
+    assert len(compiled) == len(ACTIONS)
+    assert to_actions(compiled) == ACTIONS
+    sequence = format_action_sequence(compiled)
+    assert sequence == "fff:c:f:f:f:c:x:3hKdQs:b80:r200:f:c:7c"
+    assert format_action_sequence(parse_action_sequence(sequence)) == sequence
+
+def test_validate_accepts_legal_hand():
+    validate_actions(compile_actions(ACTIONS), [1000] * 6, 0, 1, 2)
+    # Same hand with implicit actors, as parsed from the short notation
+    compiled = parse_action_sequence("fff:c:f:f:f:c:x:3hKdQs:b80:r200:f:c:7c")
+    assert to_actions(compiled)[6:8] == [{"type": "flop", "cards": "3hKdQs"}, {"type": "bet", "amount": 80}]
+    replay = HandReplay(compiled, [1000] * 6, 0, 1, 2)
+    # The flop bet and raise stay on the flop
+    state = replay.describe(replay.state_at(9))
+    assert state["street"] == "flop" and state["current_bet"] == 200 and state["pot"] == 120 + 80 + 200
+    assert replay.describe(replay.state_at(len(compiled)))["street"] == "turn"
+
+def test_replay_agrees_with_pokerkit_settlement():
+    actions = ACTIONS + [
+        {"type": "check", "player": "P2"},
+        {"type": "check", "player": "P3"},
+        {"type": "river", "cards": "2d"},
+        {"type": "check", "player": "P2"},
+        {"type": "check", "player": "P3"},
+    ]
+    cards = [["2c", "3c"], ["Qh", "Jh"], ["Kc", "Ks"], ["9c", "8d"], ["4c", "5d"], ["6c", "7d"]]
+    hand = PokerService.calculate_hand([1000] * 6, cards, actions, 0, 1, 2)
+    replay = HandReplay(compile_actions(actions), [1000] * 6, 0, 1, 2)
+    final = replay.describe(replay.state_at(len(actions)))
+    assert final["street"] == "river" and final["pot"] == 520
+    # Everyone but the winner loses exactly what the replay says they put in
+    for player in final["players"]:
+        payout = hand.winnings[player["player"]] + player["contributed"]
+        assert payout == (final["pot"] if player["player"] == "P3" else 0)
+        assert hand.stacks[player["player"]] == player["stack"] + payout
+
+def test_parse_rejects_misplaced_board_cards():
+    # Boards lumped together at the end lose their street boundaries
+    with pytest.raises(ValueError, match="Invalid board"):
+        parse_action_sequence("fff:c:f:f:f:c:x:b80:r200:f:c:3hKdQs7c")
+    with pytest.raises(ValueError, match="Invalid board"):
+        parse_action_sequence("fff:c:x:7c")
+    with pytest.raises(ValueError, match="Invalid board"):
+        parse_action_sequence("fff:c:x:3hKdQs:x:x:7c:x:x:As:x:x:2d")
+
+@pytest.mark.parametrize("actions, message", [
+    ([{"type": "check", "player": "P4"}], "cannot check"),
+    ([{"type": "turn", "cards": "7c"}], "out of order"),
+    ([{"type": "raise", "player": "P4", "amount": 2000}], "exceeds"),
+    ([{"type": "fold", "player": "P4"}, {"type": "call", "player": "P4"}], "already folded"),
+    ([{"type": "call", "player": "P5"}], "out of turn"),
+    ([{"type": "raise", "player": "P4", "amount": 41}], "minimum raise to 80"),
+    ([{"type": "raise", "player": "P4", "amount": 120}, {"type": "raise", "player": "P5", "amount": 160}], "minimum raise to 200"),
+    ([{"type": "call", "player": "P4"}, {"type": "flop", "cards": "3hKdQs"}], "before the betting round closed"),
+    (ACTIONS[:6] + [{"type": "check", "player": "P2"}], "betting round is closed"),
+])
+def test_validate_rejects_illegal_actions(actions, message):
+    with pytest.raises(ValueError, match=message):
+        validate_actions(compile_actions(actions), [1000] * 6, 0, 1, 2)
+
+def test_compile_rejects_malformed_actions():
+    with pytest.raises(ValueError, match="player id"):
+        compile_actions([{"type": "call", "player": "P0"}])
+    with pytest.raises(ValueError):
+        compile_actions([{"type": "shove", "player": "P1"}])
+    with pytest.raises(ValueError):
+        compile_actions([{"type": "bet", "player": "P1"}])
+    with pytest.raises(ValueError):
+        compile_actions([{"type": "flop", "cards": "3hKd"}])
+    # Amounts must fit the int64 opcode array
+    with pytest.raises(ValueError, match="between 0 and"):
+        compile_actions([{"type": "bet", "player": "P1", "amount": 10 ** 20}])
+    with pytest.raises(ValueError, match="between 0 and"):
+        parse_action_sequence(f"fff:b{MAX_AMOUNT + 1}")
+
+def test_validate_allows_short_all_in_without_reopening_betting():
+    actions = [
+        {"type": "raise", "player": "P1", "amount": 120},
+        {"type": "allin", "player": "P2"},
+        {"type": "call", "player": "P1"},
+    ]
+    # P2's all-in to 150 is less than a full raise, so P1 may call but not re-raise
+    validate_actions(compile_actions(actions), [1000, 150], 0, 0, 1)
+    with pytest.raises(ValueError, match="minimum raise"):
+        validate_actions(compile_actions(actions[:2] + [{"type": "raise", "player": "P1", "amount": 190}]), [1000, 150], 0, 0, 1)
+
+def test_validate_caps_pot_limit_bets():
+    # Preflop pot limit for UTG: call 40, then raise the 100 in the pot, to 140
+    validate_actions(compile_actions([{"type": "raise", "player": "P4", "amount": 140}]), [1000] * 6, 0, 1, 2, betting=POT_LIMIT)
+    with pytest.raises(ValueError, match="pot limit"):
+        validate_actions(compile_actions([{"type": "raise", "player": "P4", "amount": 141}]), [1000] * 6, 0, 1, 2, betting=POT_LIMIT)
+    with pytest.raises(ValueError, match="pot limit"):
+        validate_actions(compile_actions([{"type": "allin", "player": "P4"}]), [1000] * 6, 0, 1, 2, betting=POT_LIMIT)
+    # No-limit allows the same raise
+    validate_actions(compile_actions([{"type": "raise", "player": "P4", "amount": 141}]), [1000] * 6, 0, 1, 2)
+
+def test_replay_resumes_from_street_snapshots():
+    compiled = compile_actions(ACTIONS)
+    document = validate_actions(compiled, [1000] * 6, 0, 1, 2)
+    # Preflop, flop and turn
+    assert [row[0] for row in document["rows"]] == [0, 7, 12]
+
+    replay = HandReplay(compiled, [1000] * 6, 0, 1, 2, snapshot_document=document)
+    from_scratch = HandReplay(
+        compiled, [1000] * 6, 0, 1, 2, snapshot_document={"version": SNAPSHOT_FORMAT_VERSION, "rows": [document["rows"][0]]}
+    )
+    for index in range(len(compiled) + 1):
+        assert replay.state_at(index).to_row() == from_scratch.state_at(index).to_row()
+
+    state = replay.describe(replay.state_at(10))
+    assert state["street"] == "flop"
+    assert state["board"] == ["3h", "Kd", "Qs"]
+    assert state["pot"] == 120 + 80 + 200
+    assert state["last_action"] == {"type": "fold", "player": "P4"}
+    assert state["to_act"] == "P2"
+    assert state["players"][1] == {"player": "P2", "stack": 880, "committed": 80, "contributed": 120, "folded": False}
+
+    final = replay.describe(replay.state_at(len(compiled)))
+    assert final["street"] == "turn" and final["pot"] == 520 and final["current_bet"] == 0
+    with pytest.raises(ValueError):
+        replay.state_at(len(compiled) + 1)
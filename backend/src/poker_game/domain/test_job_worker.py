@@ -0,0 +1,140 @@
+# backend/tests/poker_game/domain/test_job_worker.py
+from datetime import datetime, timedelta, timezone
+from uuid import UUID, uuid4
+import json
+import pytest
+from src.poker_game.domain import job_worker
+from src.poker_game.domain.job_worker import JOB_HANDLERS, JobWorkerPool, register_job, shutdown_process_pool
+from src.poker_game.repositories.db_pools import DatabasePools
+
+class FakeHandRepository:
+    """Serves `hands` in pages, as HandRepository.find_page does."""
+
+    hands = []
+
+    def __init__(self, pools):
+        pass
+
+    async def count(self):
+        return len(self.hands)
+
+    async def find_page(self, limit, after=None):
+        def key(hand):
+            return datetime.fromisoformat(hand["created_at"]), UUID(hand["id"])
+        newest_first = sorted(self.hands, key=key, reverse=True)
+        return [hand for hand in newest_first if after is None or key(hand) < after][:limit]
+
+_CLOCK = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+def _hand(winnings, seats=2):
+    global _CLOCK
+    # Each hand is older than the last, so `hands` lists them newest first
+    _CLOCK -= timedelta(seconds=1)
+    return {
+        "id": str(uuid4()),
+        "stacks": json.dumps([1000] * seats),
+        "winnings": json.dumps(winnings),
+        "created_at": _CLOCK.isoformat()
+    }
+
+@pytest.fixture
+def hands(monkeypatch):
+    monkeypatch.setattr(job_worker, "HandRepository", FakeHandRepository)
+    monkeypatch.setattr(job_worker, "BATCH_SIZE", 2)
+    monkeypatch.setattr(FakeHandRepository, "hands", [])
+    return FakeHandRepository.hands
+
+@pytest.fixture
+def progress():
+    reports = []
+
+    async def report(value, partial_result=None):
+        reports.append((value, partial_result))
+    report.reports = reports
+    return report
+
+@pytest.mark.asyncio
+async def test_audit_flags_unbalanced_and_mismatched_hands(hands, progress):
+    good = _hand({"P1": 40, "P2": -40})
+    unbalanced = _hand({"P1": 40, "P2": -20})
+    mismatched = _hand({"P1": 40, "P2": -40}, seats=3)
+    hands.extend([good, unbalanced, mismatched])
+    result = await JOB_HANDLERS["audit"](None, {}, progress)
+    assert result["checked"] == 3
+    assert result["invalid"] == [
+        {"id": unbalanced["id"], "reason": "winnings do not balance"},
+        {"id": mismatched["id"], "reason": "winnings do not match seat count"},
+    ]
+    # One report per batch, with the partial result so far
+    assert [value for value, _ in progress.reports] == [2 / 3, 1.0]
+    assert progress.reports[0][1]["checked"] == 2
+
+@pytest.mark.asyncio
+async def test_hands_inserted_during_an_audit_do_not_shift_its_pages(hands):
+    hands.extend(_hand({"P1": 0, "P2": 0}) for _ in range(4))
+    oldest = _hand({"P1": 40, "P2": -20})
+    hands.append(oldest)
+
+    async def insert_newer_hand(value, partial_result=None):
+        hands.append({**_hand({"P1": 0, "P2": 0}), "created_at": datetime.now(timezone.utc).isoformat()})
+    result = await JOB_HANDLERS["audit"](None, {}, insert_newer_hand)
+    # OFFSET paging would re-read shifted hands and never reach the oldest one
+    assert result == {"checked": 5, "invalid": [{"id": oldest["id"], "reason": "winnings do not balance"}]}
+
+@pytest.mark.asyncio
+async def test_export_stops_at_max_hands(hands, progress):
+    hands.extend(_hand({"P1": 0, "P2": 0}) for _ in range(5))
+    result = await JOB_HANDLERS["export"](None, {"max_hands": 3}, progress)
+    assert result["count"] == 3
+    assert [hand["id"] for hand in result["hands"]] == [hand["id"] for hand in hands[:3]]
+    assert progress.reports[-1] == (1.0, None)
+
+@pytest.mark.asyncio
+async def test_range_equity_runs_in_a_worker_process(progress):
+    try:
+        result = await JOB_HANDLERS["range_equity"](None, {"hero": "AcKd", "villain": "AhKc", "board": "2c7d9h4s5s"}, progress)
+    finally:
+        shutdown_process_pool()
+    assert result["hero_equity"] == 0.5
+    with pytest.raises(ValueError, match="hero"):
+        await JOB_HANDLERS["range_equity"](None, {"villain": "AA"}, progress)
+
+@pytest.fixture
+def fake_handlers(monkeypatch):
+    monkeypatch.setattr(job_worker, "JOB_HANDLERS", dict(JOB_HANDLERS))
+
+    @register_job("succeeds")
+    async def succeeds(pools, params, report):
+        await report(0.5, {"half": True})
+        return {"done": params["n"]}
+
+    @register_job("fails")
+    async def fails(pools, params, report):
+        raise ValueError("bad params")
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("kind, status, argument", [
+    ("succeeds", "status = 'done'", json.dumps({"done": 1})),
+    ("fails", "status = 'failed'", "bad params"),
+    ("unknown", "status = 'failed'", "Unknown job kind: unknown"),
+])
+async def test_run_records_outcome(fake_pool, fake_handlers, kind, status, argument):
+    pool = fake_pool("UPDATE 1")
+    job_id = uuid4()
+    job = {"id": str(job_id), "kind": kind, "params": {"n": 1}, "started_at": _CLOCK.isoformat()}
+    await JobWorkerPool(DatabasePools(pool))._run(job)
+    final_query, final_args = pool.connection.queries[-1]
+    assert status in final_query
+    assert final_args == (job_id, _CLOCK, argument)
+    if kind == "succeeds":
+        assert pool.connection.queries[0][1] == (job_id, _CLOCK, 0.5, json.dumps({"half": True}))
+
+@pytest.mark.asyncio
+async def test_worker_that_lost_its_lease_stops_without_recording(fake_pool, fake_handlers):
+    # The job was requeued and claimed again: no update matches the old lease
+    pool = fake_pool("UPDATE 0")
+    job = {"id": str(uuid4()), "kind": "succeeds", "params": {"n": 1}, "started_at": _CLOCK.isoformat()}
+    await JobWorkerPool(DatabasePools(pool))._run(job)
+    # The first progress report stops the handler before it can complete or fail the job
+    (query, _), = pool.connection.queries
+    assert "progress = $3" in query
@@ -0,0 +1,86 @@
+# backend/tests/poker_game/domain/test_poker_service.py
+import pytest
+from src.poker_game import profiling
+from src.poker_game.domain.poker_service import PokerService
+from src.poker_game.profiling import MODE_STAGES, ProfileStore, current_profile, start_profile
+
+def test_heads_up_dealer_posts_small_blind_and_all_in_is_called():
+    actions = [
+        {"type": "allin", "player": "P1"},
+        {"type": "call", "player": "P2"},
+        {"type": "flop", "cards": "2c7d9h"},
+        {"type": "turn", "cards": "Ts"},
+        {"type": "river", "cards": "3s"},
+    ]
+    hand = PokerService.calculate_hand([500, 1000], [["Ah", "Ad"], ["Kc", "Kd"]], actions, 0, 0, 1)
+    assert hand.winnings == {"P1": 500, "P2": -500}
+    assert hand.stacks == {"P1": 1000, "P2": 500}
+
+def test_nine_seats_folded_to_the_big_blind():
+    cards = [[f"{rank}c", f"{rank}d"] for rank in "23456789T"]
+    actions = [{"type": "fold", "player": f"P{seat}"} for seat in (3, 4, 5, 6, 7, 8, 9, 1)]
+    hand = PokerService.calculate_hand([1000] * 9, cards, actions, 8, 0, 1)
+    assert hand.winnings == {**{f"P{seat}": 0 for seat in range(1, 10)}, "P1": -20, "P2": 20}
+
+def test_ten_seats_raise_called_then_bet_folded():
+    cards = [[f"{rank}c", f"{rank}d"] for rank in "23456789TJ"]
+    actions = (
+        [{"type": "raise", "player": "P7", "amount": 120}]
+        + [{"type": "fold", "player": f"P{seat}"} for seat in (8, 9, 10, 1, 2, 3, 4, 5)]
+        + [
+            {"type": "call", "player": "P6"},
+            {"type": "flop", "cards": "AhKhQs"},
+            {"type": "check", "player": "P6"},
+            {"type": "bet", "player": "P7", "amount": 200},
+            {"type": "fold", "player": "P6"},
+        ]
+    )
+    hand = PokerService.calculate_hand([1000] * 10, cards, actions, 3, 4, 5)
+    assert hand.winnings["P7"] == 140
+    assert hand.winnings["P5"] == -20 and hand.winnings["P6"] == -120
+    assert sum(hand.winnings.values()) == 0
+
+def test_pot_limit_omaha_showdown():
+    actions = [
+        {"type": "raise", "player": "P1", "amount": 120},
+        {"type": "call", "player": "P2"},
+        {"type": "flop", "cards": "2c7d9h"},
+        {"type": "check", "player": "P2"},
+        {"type": "bet", "player": "P1", "amount": 240},
+        {"type": "call", "player": "P2"},
+        {"type": "turn", "cards": "Ts"},
+        {"type": "check", "player": "P2"},
+        {"type": "check", "player": "P1"},
+        {"type": "river", "cards": "3s"},
+        {"type": "check", "player": "P2"},
+        {"type": "check", "player": "P1"},
+    ]
+    cards = [["Ah", "Ad", "Kc", "Kd"], ["8s", "8c", "4h", "5h"]]
+    hand = PokerService.calculate_hand([1000, 1000], cards, actions, 0, 0, 1, variant="PLO")
+    assert hand.variant == "PLO"
+    assert hand.winnings == {"P1": 360, "P2": -360}
+    # Over the pot limit: call 20, then raise the 80 in the pot, to 120 at most
+    with pytest.raises(ValueError, match="pot limit"):
+        PokerService.calculate_hand(
+            [1000, 1000], cards, [{"type": "raise", "player": "P1", "amount": 121}], 0, 0, 1, variant="PLO"
+        )
+
+def test_unfinished_hand_is_rejected():
+    with pytest.raises(ValueError, match="prematurely"):
+        PokerService.calculate_hand([1000, 1000], [["Ah", "Ad"], ["Kc", "Kd"]], [{"type": "call", "player": "P1"}], 0, 0, 1)
+
+def test_profile_flag_profiles_the_call_on_its_own(monkeypatch):
+    store = ProfileStore()
+    monkeypatch.setattr(profiling, "PROFILE_STORE", store)
+    actions = [{"type": "fold", "player": "P1"}]
+    assert current_profile() is None
+    PokerService.calculate_hand([1000, 1000], [["Ah", "Ad"], ["Kc", "Kd"]], actions, 0, 0, 1, profile=True)
+    (profile,) = store._profiles.values()
+    assert profile.label == "PokerService.calculate_hand"
+    assert set(profile.stages) == {"validation", "replay", "evaluation"}
+    assert profile.stats_text() is not None
+    # Inside an active profile the stages go to that profile instead
+    with start_profile("request", MODE_STAGES) as outer:
+        PokerService.calculate_hand([1000, 1000], [["Ah", "Ad"], ["Kc", "Kd"]], actions, 0, 0, 1, profile=True)
+    assert set(outer.stages) == {"validation", "replay", "evaluation"}
+    assert list(store._profiles.values()) == [profile, outer]
@@ -0,0 +1,66 @@
+# backend/tests/poker_game/domain/test_range_equity.py
+import pytest
+from src.poker_game.domain.hand_evaluator import BOARD_RANK_CACHE, BoardRankCache, combo_index, evaluate, parse_cards
+from src.poker_game.domain.range_equity import parse_range, range_vs_range_equity, remove_dead_cards
+
+def _combo_count(weights):
+    return sum(1 for w in weights if w)
+
+def test_parse_range():
+    assert _combo_count(parse_range("QQ+,AKs")) == 3 * 6 + 4
+    assert _combo_count(parse_range("22+,A2s+")) == 13 * 6 + 12 * 4
+    assert _combo_count(parse_range("A2s-A5s")) == 4 * 4
+    assert _combo_count(parse_range("AKo")) == 12
+    assert _combo_count(parse_range("AsKs")) == 1
+    assert max(parse_range("AK:0.5")) == 0.5
+    with pytest.raises(ValueError):
+        parse_range("AAs")
+    with pytest.raises(ValueError):
+        parse_range("AK-QJ")
+
+def test_remove_dead_cards():
+    weights = remove_dead_cards(parse_range("AA"), parse_cards("As"))
+    assert _combo_count(weights) == 3
+
+def test_evaluate_orders_categories():
+    straight_flush = evaluate(parse_cards("5h4h3h2hAh"))
+    quads = evaluate(parse_cards("KsKhKdKc2d"))
+    full_house = evaluate(parse_cards("QsQhQd2c2d"))
+    wheel = evaluate(parse_cards("5c4d3h2sAs"))
+    six_high_straight = evaluate(parse_cards("6c5d4h3s2s"))
+    assert straight_flush > quads > full_house > six_high_straight > wheel
+
+def test_river_equity_is_exact():
+    result = range_vs_range_equity("AsKs", "QhQd", "2c7d9h4s5s")
+    assert result["hero_equity"] == 0.0
+    assert result["exhaustive"]
+    chop = range_vs_range_equity("AcKd", "AhKc", "2c7d9h4s5s")
+    assert chop["hero_equity"] == 0.5
+    assert chop["tie_rate"] == 1.0
+
+def test_turn_equity_accounts_for_card_removal():
+    # Aces vs kings on the turn: only the two remaining kings save the underdog
+    result = range_vs_range_equity("AsAh", "KsKh", "2c7d9h4d")
+    assert result["runouts"] == 48
+    assert result["villain_equity"] == pytest.approx(2 / 44)
+
+def test_board_rank_cache_lru_and_counters():
+    cache = BoardRankCache(maxsize=2)
+    first, second, third = parse_cards("2c7d9h4s5s"), parse_cards("2c7d9h4s6s"), parse_cards("2c7d9h4s8s")
+    table = cache.get(first)
+    assert cache.get(list(reversed(first))) is table
+    cache.get(second)
+    cache.get(third)  # evicts the first board
+    cache.get(first)
+    assert cache.stats() == {"hits": 1, "misses": 4, "shared_hits": 0, "size": 2, "maxsize": 2}
+    assert table[combo_index(*parse_cards("AsKs"))] == evaluate(first + parse_cards("AsKs"))
+    assert table[combo_index(*parse_cards("2c3c"))] == -1
+
+def test_only_the_request_board_is_cached():
+    BOARD_RANK_CACHE.clear()
+    range_vs_range_equity("QQ+", "AKs", samples=50, seed=1)
+    range_vs_range_equity("AsAh", "KsKh", "2c7d9h4d")
+    assert BOARD_RANK_CACHE.stats()["misses"] == 0
+    range_vs_range_equity("AsKs", "QhQd", "2c7d9h4s5s")
+    range_vs_range_equity("AcKd", "AhKc", "2c7d9h4s5s")
+    assert BOARD_RANK_CACHE.stats()["misses"] == 1 and BOARD_RANK_CACHE.stats()["hits"] == 1
@@ -0,0 +1,42 @@
+# backend/tests/poker_game/domain/test_shared_tables.py
+import multiprocessing
+import pytest
+from src.poker_game.domain.hand_evaluator import COMBO_COUNT, BoardRankCache, parse_cards
+from src.poker_game.domain.shared_tables import SharedRankTableStore
+
+BOARD = sorted(parse_cards("2c7d9h4s5s"))
+OTHER_BOARD = sorted(parse_cards("2c7d9h4s6s"))
+
+def _publish_table(path):
+    # Runs in a separate worker process
+    BoardRankCache(maxsize=1, shared=SharedRankTableStore.attach(path, COMBO_COUNT)).get(BOARD)
+
+def test_store_round_trip_and_eviction(tmp_path):
+    store = SharedRankTableStore.create(str(tmp_path / "ranks.bin"), slots=1, entries=4)
+    assert store.get([1, 2, 3]) is None
+    store.put([1, 2, 3], [5, -1, 7, 9])
+    assert list(store.get([1, 2, 3])) == [5, -1, 7, 9]
+    # A single slot: the next table evicts the first
+    store.put([1, 2, 4], [1, 1, 1, 1])
+    assert store.get([1, 2, 3]) is None
+    assert list(store.get([1, 2, 4])) == [1, 1, 1, 1]
+    with pytest.raises(ValueError):
+        store.put([1, 2, 5], [1])
+    with pytest.raises(ValueError):
+        SharedRankTableStore.attach(store.path, entries=5)
+    store.close()
+
+def test_workers_share_tables_through_the_store(tmp_path):
+    path = str(tmp_path / "ranks.bin")
+    SharedRankTableStore.create(path, slots=64, entries=COMBO_COUNT).close()
+    worker = multiprocessing.get_context("fork").Process(target=_publish_table, args=(path,))
+    worker.start()
+    worker.join()
+    assert worker.exitcode == 0
+
+    cache = BoardRankCache(maxsize=1, shared=SharedRankTableStore.attach(path, COMBO_COUNT))
+    table = cache.get(BOARD)
+    assert table == BoardRankCache().get(BOARD)
+    cache.get(OTHER_BOARD)
+    assert cache.stats()["shared_hits"] == 1
+    assert cache.shared.get(OTHER_BOARD) is not None
@@ -0,0 +1,27 @@
+# backend/tests/poker_game/domain/test_variants.py
+import pytest
+from src.poker_game.domain.variants import blind_positions, get_variant, validate_player_count
+from src.poker_game.domain.poker_utils import calculate_fallback_winnings
+
+def test_blind_positions_by_table_size():
+    # Heads-up the dealer posts the small blind
+    assert blind_positions(0, 2) == (0, 1)
+    assert blind_positions(1, 2) == (1, 0)
+    assert blind_positions(5, 6) == (0, 1)
+    assert blind_positions(8, 9) == (0, 1)
+    with pytest.raises(ValueError):
+        blind_positions(6, 6)
+
+def test_variant_rules():
+    assert get_variant("NLHE").hole_cards == 2
+    assert get_variant("PLO").hole_cards == 4
+    with pytest.raises(ValueError):
+        get_variant("Razz")
+    validate_player_count(10, get_variant("NLHE"))
+    with pytest.raises(ValueError):
+        validate_player_count(11, get_variant("NLHE"))
+
+def test_fallback_winnings_sized_per_table():
+    assert calculate_fallback_winnings([0] * 9, 4) == {f"P{i+1}": 0 for i in range(9)}
+    with pytest.raises(ValueError):
+        calculate_fallback_winnings([0] * 2, 2)
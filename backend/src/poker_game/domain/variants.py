@@ -0,0 +1,63 @@
+# backend/src/poker_game/domain/variants.py
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+MIN_PLAYERS = 2
+MAX_PLAYERS = 10
+
+# Betting structures: how large a bet or raise may be
+NO_LIMIT = "no-limit"
+POT_LIMIT = "pot-limit"
+
+@dataclass(frozen=True)
+class VariantRules:
+    """
+    Per-variant rule table used by the service, the API validators and the Hand model.
+
+    `game` is the name of the pokerkit class used to build the state, so this module
+    can be imported without pulling in pokerkit.
+    """
+    name: str
+    game: str
+    hole_cards: int
+    betting: str
+    min_players: int = MIN_PLAYERS
+    max_players: int = MAX_PLAYERS
+
+VARIANTS: Dict[str, VariantRules] = {
+    "NLHE": VariantRules(name="NLHE", game="NoLimitTexasHoldem", hole_cards=2, betting=NO_LIMIT),
+    "PLO": VariantRules(name="PLO", game="PotLimitOmahaHoldem", hole_cards=4, betting=POT_LIMIT),
+}
+
+DEFAULT_VARIANT = "NLHE"
+
+def get_variant(name: str) -> VariantRules:
+    """
+    Look up the rule table for a variant.
+
+    Raises:
+        ValueError: If the variant is not supported.
+    """
+    rules = VARIANTS.get(name)
+    if rules is None:
+        raise ValueError(f"Variant must be one of {list(VARIANTS)}")
+    return rules
+
+def validate_player_count(player_count: int, rules: VariantRules) -> None:
+    """Raise ValueError if the table size is outside the variant's seat range."""
+    if not (rules.min_players <= player_count <= rules.max_players):
+        raise ValueError(
+            f"{rules.name} requires between {rules.min_players} and {rules.max_players} players, got {player_count}"
+        )
+
+def blind_positions(dealer_position: int, player_count: int) -> Tuple[int, int]:
+    """
+    Return the expected (small blind, big blind) seats for a dealer seat.
+
+    Heads-up the dealer posts the small blind; otherwise the blinds follow the dealer.
+    """
+    if not (0 <= dealer_position < player_count):
+        raise ValueError(f"Dealer position must be between 0 and {player_count - 1}")
+    small_blind = dealer_position if player_count == 2 else (dealer_position + 1) % player_count
+    big_blind = (small_blind + 1) % player_count
+    return small_blind, big_blind
@@ -4,6 +4,7 @@ from uuid import UUID
 from datetime import datetime
 from typing import Dict, List
 import logging
+from ..domain.variants import DEFAULT_VARIANT, get_variant, validate_player_count
 
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
@@ -17,16 +18,21 @@ class Hand:
     small_blind_position: int
     big_blind_position: int
     player_cards: Dict[str, List[str]]  # e.g., {"P1": ["Ac", "Ad"], ...}
-    action_sequence: str  # e.g., "fff:c:b40:5c6c7c"
+    action_sequence: str  # e.g., "fff:c:x:5c6c7c:b40:c:Kd"
     winnings: Dict[str, int]  # e.g., {"P1": -40, "P2": 80, ...}
     created_at: datetime
+    variant: str = DEFAULT_VARIANT  # e.g., "NLHE", "PLO"
     
     def __post_init__(self):
         # Log the initial state of winnings
         logger.debug(f"Hand.__post_init__ called with winnings: {self.winnings}")
         
+        # Validate table size against the variant's rules
+        rules = get_variant(self.variant)
+        validate_player_count(len(self.stacks), rules)
+
         # Validate winnings dictionary
-        expected_players = {f"P{i+1}" for i in range(6)}
+        expected_players = {f"P{i+1}" for i in range(len(self.stacks))}
         if not isinstance(self.winnings, dict):
             logger.error(f"Invalid winnings type: {type(self.winnings)}, expected dict")
             raise ValueError("Winnings must be a dictionary")
@@ -0,0 +1,35 @@
+# backend/tests/poker_game/models/test_hand.py
+from datetime import datetime
+from uuid import uuid4
+import pytest
+from src.poker_game.models.hand import Hand
+
+def _hand(player_count, variant="NLHE", winnings=None):
+    players = [f"P{i + 1}" for i in range(player_count)]
+    hole_cards = 4 if variant == "PLO" else 2
+    return Hand(
+        id=uuid4(),
+        stacks={player: 1000 for player in players},
+        dealer_position=0,
+        small_blind_position=0 if player_count == 2 else 1,
+        big_blind_position=1 if player_count == 2 else 2,
+        player_cards={player: ["As", "Kd", "Qh", "Jc"][:hole_cards] for player in players},
+        action_sequence="fff:f",
+        winnings=winnings if winnings is not None else {player: 0 for player in players},
+        created_at=datetime.now(),
+        variant=variant
+    )
+
+@pytest.mark.parametrize("player_count", [2, 9, 10])
+def test_hand_accepts_heads_up_and_full_ring(player_count):
+    hand = _hand(player_count)
+    assert len(hand.winnings) == player_count
+
+def test_hand_rejects_bad_table_sizes_and_winnings():
+    with pytest.raises(ValueError):
+        _hand(11)
+    with pytest.raises(ValueError, match="keys"):
+        _hand(2, winnings={"P1": 0, "P2": 0, "P3": 0})
+    with pytest.raises(ValueError, match="balance"):
+        _hand(2, winnings={"P1": 40, "P2": 0})
+    assert _hand(6, variant="PLO").variant == "PLO"
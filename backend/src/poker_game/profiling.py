@@ -0,0 +1,299 @@
+# backend/src/poker_game/profiling.py
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional
+from uuid import UUID, uuid4
+import cProfile
+import io
+import json
+import logging
+import marshal
+import os
+import pstats
+import random
+import threading
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Opt-in profiling controls; off unless PROFILING_ENABLED is set
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "0").lower() in ("1", "true", "yes")
+# Fraction of flagged requests that are actually profiled
+PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", "1.0"))
+# Profiles kept for download, oldest dropped first
+PROFILING_MAX_STORED = int(os.getenv("PROFILING_MAX_STORED", "100"))
+# Directory profiles are kept in, so every worker process can serve any of them;
+# set by the multi-worker launcher. Unset, profiles are kept in memory
+PROFILING_DIR_ENV = "PROFILING_DIR"
+# Number of stats lines included in the JSON report
+PROFILING_TOP_FUNCTIONS = 40
+
+# Profile modes requested by clients: stage timings only, or stage timings plus cProfile
+MODE_STAGES = "stages"
+MODE_CPROFILE = "cprofile"
+
+_current_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("current_profile", default=None)
+
+# A cProfile capture hooks at least the whole thread (every thread, from Python 3.12), so
+# only one profile captures at a time; sections that find it busy get stage timings only
+_cprofile_lock = threading.Lock()
+
+class RequestProfile:
+    """
+    Per-stage wall-clock timings for one request, optionally with a cProfile capture.
+
+    cProfile only runs inside `profile_stage` sections, which wrap synchronous code:
+    enabling it across an `await` would also record whatever other requests the
+    event loop ran in the meantime. Time spent awaiting (database calls) is covered
+    by the stage timings alone.
+    """
+
+    def __init__(self, label: str, mode: str = MODE_CPROFILE):
+        self.id = str(uuid4())
+        self.label = label
+        self.mode = mode
+        self.stages: Dict[str, float] = {}
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self._last_mark = self._start
+        self._total: Optional[float] = None
+        self._profiler: Optional[cProfile.Profile] = None
+        # A capture loaded from a ProfileStore directory
+        self._pstats_path: Optional[str] = None
+        self._capturing = False
+        # Sections that ran without cProfile because another capture was running
+        self.skipped_sections = 0
+
+    @property
+    def has_capture(self) -> bool:
+        return self._profiler is not None or self._pstats_path is not None
+
+    def _resume_cprofile(self) -> bool:
+        """Start capturing for a section; False if not capturing or already capturing (nested section)."""
+        if self.mode != MODE_CPROFILE or self._capturing:
+            return False
+        if not _cprofile_lock.acquire(blocking=False):
+            self.skipped_sections += 1
+            logger.debug(f"Profile {self.id}: another cProfile capture is running, section timed only")
+            return False
+        if self._profiler is None:
+            self._profiler = cProfile.Profile()
+        self._capturing = True
+        self._profiler.enable()
+        return True
+
+    def _pause_cprofile(self) -> None:
+        self._profiler.disable()
+        self._capturing = False
+        _cprofile_lock.release()
+
+    def add(self, stage: str, seconds: float) -> None:
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def mark(self, stage: str) -> None:
+        """Attribute the time since the previous mark, section end or start to `stage`."""
+        now = time.perf_counter()
+        self.add(stage, now - self._last_mark)
+        self._last_mark = now
+
+    def end_section(self, stage: str, start: float) -> None:
+        """Record a `profile_stage` section; the next mark starts counting from here."""
+        now = time.perf_counter()
+        self.add(stage, now - start)
+        self._last_mark = now
+
+    def finish(self) -> None:
+        self._total = time.perf_counter() - self._start
+
+    def stats_text(self, limit: Optional[int] = PROFILING_TOP_FUNCTIONS) -> Optional[str]:
+        """cProfile stats sorted by cumulative time; all functions when `limit` is None."""
+        if not self.has_capture:
+            return None
+        stream = io.StringIO()
+        stats = pstats.Stats(self._profiler or self._pstats_path, stream=stream).sort_stats("cumulative")
+        if limit is None:
+            stats.print_stats()
+        else:
+            stats.print_stats(limit)
+        return stream.getvalue()
+
+    def pstats_bytes(self) -> Optional[bytes]:
+        """The capture in the binary format written by pstats.dump_stats (loadable with pstats/snakeviz)."""
+        if self._pstats_path is not None:
+            with open(self._pstats_path, "rb") as f:
+                return f.read()
+        if self._profiler is None:
+            return None
+        self._profiler.create_stats()
+        return marshal.dumps(self._profiler.stats)
+
+    def to_dict(self) -> Dict:
+        """The timings, without the capture, for ProfileStore files."""
+        return {
+            "id": self.id,
+            "label": self.label,
+            "mode": self.mode,
+            "started_at": self.started_at,
+            "total": self._total,
+            "stages": self.stages,
+            "skipped_sections": self.skipped_sections,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict, pstats_path: Optional[str] = None) -> "RequestProfile":
+        profile = cls(data["label"], data["mode"])
+        profile.id = data["id"]
+        profile.started_at = data["started_at"]
+        profile._total = data["total"]
+        profile.stages = data["stages"]
+        profile.skipped_sections = data["skipped_sections"]
+        profile._pstats_path = pstats_path
+        return profile
+
+    def report(self) -> Dict:
+        return {
+            "id": self.id,
+            "label": self.label,
+            "mode": self.mode,
+            "started_at": self.started_at,
+            "total_ms": round(self._total * 1000, 3) if self._total is not None else None,
+            "stages_ms": {stage: round(seconds * 1000, 3) for stage, seconds in self.stages.items()},
+            "skipped_sections": self.skipped_sections,
+            "stats": self.stats_text(),
+        }
+
+class ProfileStore:
+    """
+    Bounded store of finished profiles: in memory for one process, or, with a
+    `directory`, as files every worker process reads (a timings JSON file and,
+    for cProfile captures, a .pstats file per profile).
+    """
+
+    def __init__(self, maxsize: int = PROFILING_MAX_STORED, directory: Optional[str] = None):
+        self.maxsize = maxsize
+        self.directory: Optional[str] = None
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+        self._lock = threading.Lock()
+        if directory:
+            self.set_directory(directory)
+
+    def set_directory(self, directory: str) -> None:
+        """Keep profiles in `directory` from now on (called before worker processes fork)."""
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+
+    def _path(self, profile_id: str, extension: str) -> str:
+        return os.path.join(self.directory, f"{profile_id}.{extension}")
+
+    def add(self, profile: RequestProfile) -> None:
+        if self.directory:
+            self._write(profile)
+            return
+        with self._lock:
+            self._profiles[profile.id] = profile
+            while len(self._profiles) > self.maxsize:
+                self._profiles.popitem(last=False)
+
+    def _write(self, profile: RequestProfile) -> None:
+        if profile._profiler is not None:
+            profile._profiler.dump_stats(self._path(profile.id, "pstats"))
+        # The JSON file is renamed into place last, so readers never see a partial profile
+        temp_path = self._path(profile.id, "json.tmp")
+        with open(temp_path, "w") as f:
+            json.dump(profile.to_dict(), f)
+        os.replace(temp_path, self._path(profile.id, "json"))
+        self._prune()
+
+    def _prune(self) -> None:
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(".json")]
+            if len(names) <= self.maxsize:
+                return
+            names.sort(key=lambda name: os.path.getmtime(os.path.join(self.directory, name)))
+            for name in names[:len(names) - self.maxsize]:
+                profile_id = name[:-len(".json")]
+                for extension in ("json", "pstats"):
+                    try:
+                        os.remove(self._path(profile_id, extension))
+                    except FileNotFoundError:
+                        pass
+        except OSError as e:
+            # Another worker pruning at the same time
+            logger.debug(f"Failed to prune stored profiles: {str(e)}")
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        if not self.directory:
+            with self._lock:
+                return self._profiles.get(profile_id)
+        try:
+            # Only ids we generated name files in the directory
+            profile_id = str(UUID(profile_id))
+        except ValueError:
+            return None
+        try:
+            with open(self._path(profile_id, "json")) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        pstats_path = self._path(profile_id, "pstats")
+        return RequestProfile.from_dict(data, pstats_path if os.path.exists(pstats_path) else None)
+
+PROFILE_STORE = ProfileStore(directory=os.getenv(PROFILING_DIR_ENV))
+
+def should_profile(flag: Optional[str]) -> Optional[str]:
+    """
+    Map a client's profile flag (query parameter or header) to a mode, or None when
+    profiling is disabled, the flag is absent, or the request is not sampled.
+    """
+    if not PROFILING_ENABLED or not flag:
+        return None
+    flag = flag.lower()
+    if flag in ("0", "false", "no"):
+        return None
+    if random.random() >= PROFILING_SAMPLE_RATE:
+        return None
+    return MODE_STAGES if flag == MODE_STAGES else MODE_CPROFILE
+
+def current_profile() -> Optional[RequestProfile]:
+    return _current_profile.get()
+
+@contextmanager
+def start_profile(label: str, mode: str = MODE_CPROFILE) -> Iterator[RequestProfile]:
+    """Profile the enclosed block and keep the result in PROFILE_STORE."""
+    profile = RequestProfile(label, mode)
+    token = _current_profile.set(profile)
+    try:
+        yield profile
+    finally:
+        profile.finish()
+        _current_profile.reset(token)
+        PROFILE_STORE.add(profile)
+        logger.info(f"Stored profile {profile.id} for {label}: {profile.report()['stages_ms']}")
+
+@contextmanager
+def profile_stage(stage: str) -> Iterator[None]:
+    """
+    Time the enclosed block as `stage` of the active profile, under cProfile in
+    cProfile mode; a no-op when no profile is active. The block must not await.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        yield
+        return
+    capturing = profile._resume_cprofile()
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        if capturing:
+            profile._pause_cprofile()
+        profile.end_section(stage, start)
+
+def mark_stage(stage: str) -> None:
+    """Attribute the time since the active profile's previous mark to `stage`."""
+    profile = _current_profile.get()
+    if profile is not None:
+        profile.mark(stage)
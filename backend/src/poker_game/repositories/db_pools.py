@@ -0,0 +1,119 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+import asyncio
+import logging
+import time
+import asyncpg
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Query intents used to route to a pool
+READ = "read"
+WRITE = "write"
+
+# Seconds the replica is behind the primary; 0 when it has replayed everything it received,
+# so an idle primary doesn't make a caught-up replica look stale. NULL when no WAL receiver
+# is streaming: a replica cut off from its upstream has nothing left to receive and would
+# otherwise report 0 forever. (Without pg_read_all_stats the status column reads NULL,
+# so only the receiver's presence is checked.)
+REPLICA_LAG_QUERY = """
+    SELECT CASE
+        WHEN NOT pg_is_in_recovery() THEN 0
+        WHEN NOT EXISTS (
+            SELECT 1 FROM pg_stat_wal_receiver WHERE COALESCE(status, 'streaming') = 'streaming'
+        ) THEN NULL
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+    END
+"""
+
+class DatabasePools:
+    """
+    A primary pool for writes and an optional replica pool for reads.
+
+    Reads go to the replica while its measured lag is within `max_replica_lag`
+    seconds; otherwise, or when the replica cannot be reached, they fall back
+    to the primary. Lag is measured at most every `lag_check_interval` seconds,
+    and a check taking longer than `lag_check_timeout` seconds counts as a failure;
+    while one check runs, other reads use the previous measurement.
+    """
+
+    def __init__(
+        self,
+        primary: asyncpg.Pool,
+        replica: Optional[asyncpg.Pool] = None,
+        max_replica_lag: float = 5.0,
+        lag_check_interval: float = 5.0,
+        lag_check_timeout: float = 1.0
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.max_replica_lag = max_replica_lag
+        self.lag_check_interval = lag_check_interval
+        self.lag_check_timeout = lag_check_timeout
+        self._replica_lag: Optional[float] = None
+        self._lag_checked_at = float("-inf")
+        self._lag_lock = asyncio.Lock()
+
+    @classmethod
+    async def create(
+        cls,
+        primary_url: str,
+        replica_url: Optional[str] = None,
+        min_size: int = 2,
+        max_size: int = 10,
+        **kwargs
+    ) -> "DatabasePools":
+        primary = await asyncpg.create_pool(primary_url, min_size=min_size, max_size=max_size)
+        if primary is None:
+            raise ValueError("Failed to create primary database pool")
+        replica = None
+        if replica_url:
+            replica = await asyncpg.create_pool(replica_url, min_size=min_size, max_size=max_size)
+            if replica is None:
+                raise ValueError("Failed to create replica database pool")
+        return cls(primary, replica, **kwargs)
+
+    async def replica_lag(self) -> Optional[float]:
+        """Last measured replica lag in seconds (inf if unreachable), refreshed when stale."""
+        if self.replica is None:
+            return None
+        if self._lag_lock.locked() and self._replica_lag is not None:
+            # Another read is already measuring; don't queue behind it
+            return self._replica_lag
+        async with self._lag_lock:
+            if time.monotonic() - self._lag_checked_at >= self.lag_check_interval:
+                try:
+                    async with self.replica.acquire(timeout=self.lag_check_timeout) as conn:
+                        lag = await conn.fetchval(REPLICA_LAG_QUERY, timeout=self.lag_check_timeout)
+                    if lag is None:
+                        logger.warning("Replica is not streaming from its primary, routing reads to primary")
+                    self._replica_lag = float(lag) if lag is not None else float("inf")
+                except (asyncpg.PostgresError, asyncpg.InterfaceError, OSError, asyncio.TimeoutError) as e:
+                    logger.warning(f"Replica lag check failed, routing reads to primary: {str(e)}")
+                    self._replica_lag = float("inf")
+                self._lag_checked_at = time.monotonic()
+            return self._replica_lag
+
+    async def pool_for(self, intent: str) -> asyncpg.Pool:
+        if intent not in (READ, WRITE):
+            raise ValueError(f"Unknown query intent: {intent}")
+        if intent == READ and self.replica is not None:
+            lag = await self.replica_lag()
+            if lag is not None and lag <= self.max_replica_lag:
+                return self.replica
+            logger.debug(f"Replica lag {lag}s exceeds {self.max_replica_lag}s, reading from primary")
+        return self.primary
+
+    @asynccontextmanager
+    async def acquire(self, intent: str) -> AsyncIterator[asyncpg.Connection]:
+        pool = await self.pool_for(intent)
+        async with pool.acquire() as conn:
+            yield conn
+
+    async def close(self) -> None:
+        await self.primary.close()
+        if self.replica is not None:
+            await self.replica.close()
@@ -0,0 +1,39 @@
+from typing import Dict, List
+import gzip
+import json
+import os
+
+# Column order of archived hands; matches the dictionaries returned by HandRepository
+ARCHIVE_COLUMNS = [
+    "id", "stacks", "dealer_position", "small_blind_position", "big_blind_position",
+    "player_cards", "action_sequence", "winnings", "created_at", "variant"
+]
+
+ARCHIVE_FORMAT_VERSION = 1
+
+def write_archive(path: str, hands: List[Dict]) -> None:
+    """
+    Write hands to a gzip-compressed columnar file: one array per column, so
+    repetitive columns (positions, variant) compress well and a reader can
+    pick columns without decoding whole rows.
+    """
+    columns = {column: [hand[column] for hand in hands] for column in ARCHIVE_COLUMNS}
+    document = {"version": ARCHIVE_FORMAT_VERSION, "row_count": len(hands), "columns": columns}
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # Write to a temporary file first so a crash never leaves a truncated archive behind
+    temp_path = f"{path}.tmp"
+    with gzip.open(temp_path, "wt", encoding="utf-8") as f:
+        json.dump(document, f, separators=(",", ":"))
+    os.replace(temp_path, path)
+
+def read_archive(path: str) -> List[Dict]:
+    """Read an archive written by write_archive back into hand dictionaries."""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        document = json.load(f)
+    if document.get("version") != ARCHIVE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported archive format in {path}: {document.get('version')}")
+    columns = document["columns"]
+    return [
+        {column: columns[column][i] for column in ARCHIVE_COLUMNS}
+        for i in range(document["row_count"])
+    ]
@@ -1,14 +1,64 @@
 from uuid import UUID, uuid4
-from typing import List, Optional, Dict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Dict, Tuple, Union
 import asyncpg
 from ..models.hand import Hand
-from datetime import datetime
+from ..domain.variants import DEFAULT_VARIANT
+from .hand_archive import read_archive, write_archive
+from .db_pools import READ, WRITE, DatabasePools
+from datetime import datetime, timezone
+import asyncio
 import json
+import re
+
+# One hand as a JSON object built by Postgres; JSONB columns are embedded as-is
+HAND_JSON_OBJECT = """
+    json_build_object(
+        'id', id,
+        'stacks', stacks,
+        'dealer_position', dealer_position,
+        'small_blind_position', small_blind_position,
+        'big_blind_position', big_blind_position,
+        'player_cards', player_cards,
+        'action_sequence', action_sequence,
+        'winnings', winnings,
+        'created_at', created_at,
+        'variant', variant
+    )
+"""
 
 class HandRepository:
-    def __init__(self, connection: asyncpg.Connection):
+    def __init__(self, connection: Union[asyncpg.Connection, DatabasePools]):
+        """
+        `connection` is either a single connection, used for every query, or the
+        role-aware pools, in which case each query is routed by its intent:
+        writes to the primary, reads to the replica when it is fresh enough.
+        """
         self.connection = connection
 
+    @asynccontextmanager
+    async def _acquire(self, intent: str) -> AsyncIterator[asyncpg.Connection]:
+        if isinstance(self.connection, DatabasePools):
+            async with self.connection.acquire(intent) as conn:
+                yield conn
+        else:
+            yield self.connection
+
+    @staticmethod
+    def _to_dict(record: asyncpg.Record) -> Dict:
+        return {
+            "id": str(record["id"]),
+            "stacks": record["stacks"],
+            "dealer_position": record["dealer_position"],
+            "small_blind_position": record["small_blind_position"],
+            "big_blind_position": record["big_blind_position"],
+            "player_cards": record["player_cards"],
+            "action_sequence": record["action_sequence"],
+            "winnings": record["winnings"],
+            "created_at": record["created_at"].isoformat() if record["created_at"] else None,
+            "variant": record["variant"]
+        }
+
     async def save(self, hand_data: Dict) -> Dict[str, str]:
         """
         Save hand data to the database and return a dictionary with the hand's ID.
@@ -16,6 +66,8 @@ class HandRepository:
         """
         hand_id = hand_data.get("id", str(uuid4()))
         created_at = hand_data.get("created_at", datetime.utcnow())
+        variant = hand_data.get("variant", DEFAULT_VARIANT)
+        state_snapshots = hand_data.get("state_snapshots")
 
         # Validate required fields
         required_fields = ["stacks", "player_cards", "action_sequence", "winnings", "dealer_position", "small_blind_position", "big_blind_position"]
@@ -31,8 +83,8 @@ class HandRepository:
 
         query = """
             INSERT INTO hands (id, stacks, dealer_position, small_blind_position, big_blind_position,
-                              player_cards, action_sequence, winnings, created_at)
-            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9)
+                              player_cards, action_sequence, winnings, created_at, variant, state_snapshots)
+            VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
             RETURNING id
         """
         try:
@@ -45,6 +97,7 @@ class HandRepository:
             elif not isinstance(action_sequence, str):
                 raise ValueError(f"Invalid action_sequence type after conversion: {type(action_sequence)}")
             winnings_serialized = json.dumps(hand_data["winnings"])
+            snapshots_serialized = json.dumps(state_snapshots) if state_snapshots is not None else None
 
             # Debug: Log query arguments
             print(f"Debug: Saving hand with stacks = {stacks}, type = {type(stacks)}")
@@ -53,20 +106,23 @@ class HandRepository:
                   f"big_blind_position={hand_data['big_blind_position']}, "
                   f"player_cards={player_cards}, "
                   f"action_sequence={action_sequence}, "
-                  f"winnings={winnings_serialized}, created_at={created_at}")
-
-            result = await self.connection.fetchrow(
-                query,
-                UUID(hand_id),
-                stacks,
-                hand_data["dealer_position"],
-                hand_data["small_blind_position"],
-                hand_data["big_blind_position"],
-                player_cards,
-                action_sequence,
-                winnings_serialized,
-                created_at
-            )
+                  f"winnings={winnings_serialized}, created_at={created_at}, variant={variant}")
+
+            async with self._acquire(WRITE) as conn:
+                result = await conn.fetchrow(
+                    query,
+                    UUID(hand_id),
+                    stacks,
+                    hand_data["dealer_position"],
+                    hand_data["small_blind_position"],
+                    hand_data["big_blind_position"],
+                    player_cards,
+                    action_sequence,
+                    winnings_serialized,
+                    created_at,
+                    variant,
+                    snapshots_serialized
+                )
             if result is None or "id" not in result:
                 raise ValueError("Failed to retrieve ID from database after saving hand")
             return {"id": str(result["id"])}
@@ -81,54 +137,219 @@ class HandRepository:
         """Find a Hand by its ID and return a dictionary."""
         query = """
             SELECT id, stacks, dealer_position, small_blind_position, big_blind_position,
-                   player_cards, action_sequence, winnings, created_at
+                   player_cards, action_sequence, winnings, created_at, variant
             FROM hands WHERE id = $1
         """
-        record = await self.connection.fetchrow(query, id)
+        async with self._acquire(READ) as conn:
+            record = await conn.fetchrow(query, id)
+        if not record:
+            return None
+        return self._to_dict(record)
+
+    async def find_replay_source(self, id: UUID) -> Optional[Dict]:
+        """
+        Find what is needed to replay a Hand's betting: decoded stacks, positions,
+        action sequence and stored state snapshots (None if not stored).
+        Read from the primary: clients ask for a hand's state right after posting it,
+        before a replica may have the row.
+        """
+        query = """
+            SELECT id, stacks, dealer_position, small_blind_position, big_blind_position,
+                   action_sequence, variant, state_snapshots
+            FROM hands WHERE id = $1
+        """
+        async with self._acquire(WRITE) as conn:
+            record = await conn.fetchrow(query, id)
         if not record:
             return None
         return {
             "id": str(record["id"]),
-            "stacks": record["stacks"],
+            "stacks": json.loads(record["stacks"]),
             "dealer_position": record["dealer_position"],
             "small_blind_position": record["small_blind_position"],
             "big_blind_position": record["big_blind_position"],
-            "player_cards": record["player_cards"],
-            "action_sequence": record["action_sequence"],
-            "winnings": record["winnings"],
-            "created_at": record["created_at"].isoformat() if record["created_at"] else None
+            "action_sequence": json.loads(record["action_sequence"]),
+            "variant": record["variant"],
+            "state_snapshots": json.loads(record["state_snapshots"]) if record["state_snapshots"] else None
         }
 
     async def find_all(self, limit: int = 100, offset: int = 0) -> List[Dict]:
         """Retrieve all Hands with pagination and return a list of dictionaries."""
         query = """
             SELECT id, stacks, dealer_position, small_blind_position, big_blind_position,
-                   player_cards, action_sequence, winnings, created_at
+                   player_cards, action_sequence, winnings, created_at, variant
             FROM hands
             ORDER BY created_at DESC
             LIMIT $1 OFFSET $2
         """
-        records = await self.connection.fetch(query, limit, offset)
-        return [
-            {
-                "id": str(record["id"]),
-                "stacks": record["stacks"],
-                "dealer_position": record["dealer_position"],
-                "small_blind_position": record["small_blind_position"],
-                "big_blind_position": record["big_blind_position"],
-                "player_cards": record["player_cards"],
-                "action_sequence": record["action_sequence"],
-                "winnings": record["winnings"],
-                "created_at": record["created_at"].isoformat() if record["created_at"] else None
-            }
-            for record in records
-        ]
+        async with self._acquire(READ) as conn:
+            records = await conn.fetch(query, limit, offset)
+        return [self._to_dict(record) for record in records]
+
+    async def find_page(self, limit: int, after: Optional[Tuple[datetime, UUID]] = None) -> List[Dict]:
+        """
+        Retrieve up to `limit` Hands, newest first, continuing after `after`: the
+        (created_at, id) key of the previous page's last hand. Unlike OFFSET paging,
+        hands inserted between pages don't shift later pages, so a long scan sees
+        every hand that existed when it started exactly once.
+        """
+        query = """
+            SELECT id, stacks, dealer_position, small_blind_position, big_blind_position,
+                   player_cards, action_sequence, winnings, created_at, variant
+            FROM hands
+            WHERE $2::TIMESTAMPTZ IS NULL OR (created_at, id) < ($2, $3)
+            ORDER BY created_at DESC, id DESC
+            LIMIT $1
+        """
+        created_at, id = after if after is not None else (None, None)
+        async with self._acquire(READ) as conn:
+            records = await conn.fetch(query, limit, created_at, id)
+        return [self._to_dict(record) for record in records]
+
+    async def find_one_by_id_json(self, id: UUID) -> Optional[str]:
+        """Find a Hand by its ID as a JSON document serialized by Postgres."""
+        query = f"SELECT {HAND_JSON_OBJECT}::text FROM hands WHERE id = $1"
+        async with self._acquire(READ) as conn:
+            return await conn.fetchval(query, id)
+
+    async def find_all_json(self, limit: int = 100, offset: int = 0) -> str:
+        """
+        Retrieve a page of Hands as one JSON array serialized by Postgres, so the
+        API can send it without decoding the JSONB columns into Python objects.
+        """
+        query = f"""
+            SELECT COALESCE(json_agg({HAND_JSON_OBJECT} ORDER BY created_at DESC), '[]'::json)::text
+            FROM (
+                SELECT id, stacks, dealer_position, small_blind_position, big_blind_position,
+                       player_cards, action_sequence, winnings, created_at, variant
+                FROM hands
+                ORDER BY created_at DESC
+                LIMIT $1 OFFSET $2
+            ) page
+        """
+        async with self._acquire(READ) as conn:
+            return await conn.fetchval(query, limit, offset)
+
+    async def find_range(self, start: datetime, end: datetime, include_archived: bool = False) -> List[Dict]:
+        """
+        Retrieve Hands created in [start, end), newest first. The created_at bounds
+        let Postgres prune to the matching monthly partitions; archived months are
+        read from their files when `include_archived` is set.
+        """
+        query = """
+            SELECT id, stacks, dealer_position, small_blind_position, big_blind_position,
+                   player_cards, action_sequence, winnings, created_at, variant
+            FROM hands
+            WHERE created_at >= $1 AND created_at < $2
+            ORDER BY created_at DESC
+        """
+        async with self._acquire(READ) as conn:
+            records = await conn.fetch(query, start, end)
+        hands = [self._to_dict(record) for record in records]
+        if include_archived:
+            hands.extend(await self.find_archived(start, end))
+            hands.sort(key=lambda hand: hand["created_at"] or "", reverse=True)
+        return hands
+
+    async def find_archived(self, start: datetime, end: datetime) -> List[Dict]:
+        """Retrieve archived Hands created in [start, end) from the columnar archive files."""
+        async with self._acquire(READ) as conn:
+            archives = await conn.fetch(
+                """
+                SELECT path FROM hand_archives
+                WHERE range_start < $2 AND range_end > $1
+                ORDER BY range_start DESC
+                """,
+                start,
+                end
+            )
+        # Archived created_at values are timezone-aware; treat naive bounds as UTC
+        start = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+        end = end if end.tzinfo else end.replace(tzinfo=timezone.utc)
+        loop = asyncio.get_running_loop()
+        hands = []
+        for archive in archives:
+            # Decompressing and decoding happens off the event loop
+            for hand in await loop.run_in_executor(None, read_archive, archive["path"]):
+                created_at = datetime.fromisoformat(hand["created_at"])
+                if start <= created_at < end:
+                    hands.append(hand)
+        return hands
+
+    async def list_partitions(self) -> List[Dict]:
+        """List the monthly hands partitions (hands_YYYY_MM) with their month ranges."""
+        async with self._acquire(WRITE) as conn:
+            records = await conn.fetch(
+                """
+                SELECT c.relname AS partition_name
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'hands'::regclass AND c.relname ~ '^hands_[0-9]{4}_[0-9]{2}$'
+                ORDER BY c.relname
+                """
+            )
+        partitions = []
+        for record in records:
+            year, month = int(record["partition_name"][6:10]), int(record["partition_name"][11:13])
+            range_start = datetime(year, month, 1, tzinfo=timezone.utc)
+            range_end = datetime(year + month // 12, month % 12 + 1, 1, tzinfo=timezone.utc)
+            partitions.append({"partition_name": record["partition_name"], "range_start": range_start, "range_end": range_end})
+        return partitions
+
+    async def archive_partition(self, partition: Dict, path: str) -> int:
+        """
+        Export one monthly partition to a columnar archive file, then detach and
+        drop it and record the file in hand_archives. Returns the number of rows archived.
+        Everything happens in one transaction, with the partition locked against writes
+        before it is read, so no row can be added between the export and the DROP; a
+        failure rolls back and leaves the partition in place.
+        """
+        partition_name = partition["partition_name"]
+        if not re.fullmatch(r"hands_[0-9]{4}_[0-9]{2}", partition_name):
+            raise ValueError(f"Invalid partition name: {partition_name}")
+
+        async with self._acquire(WRITE) as conn:
+            async with conn.transaction():
+                # SHARE mode blocks inserts, updates and deletes but not reads
+                await conn.execute(f"LOCK TABLE {partition_name} IN SHARE MODE")
+                records = await conn.fetch(
+                    f"""
+                    SELECT id, stacks, dealer_position, small_blind_position, big_blind_position,
+                           player_cards, action_sequence, winnings, created_at, variant
+                    FROM {partition_name}
+                    ORDER BY created_at
+                    """
+                )
+                hands = [self._to_dict(record) for record in records]
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, write_archive, path, hands)
+
+                await conn.execute(f"ALTER TABLE hands DETACH PARTITION {partition_name}")
+                await conn.execute(
+                    """
+                    INSERT INTO hand_archives (partition_name, range_start, range_end, path, row_count)
+                    VALUES ($1, $2, $3, $4, $5)
+                    """,
+                    partition_name,
+                    partition["range_start"],
+                    partition["range_end"],
+                    path,
+                    len(hands)
+                )
+                await conn.execute(f"DROP TABLE {partition_name}")
+        return len(hands)
+
+    async def count(self) -> int:
+        """Return the total number of stored Hands."""
+        async with self._acquire(READ) as conn:
+            return await conn.fetchval("SELECT COUNT(*) FROM hands")
 
     async def delete(self, id: UUID) -> None:
         """Delete a Hand by its ID."""
         query = """
             DELETE FROM hands WHERE id = $1
         """
-        result = await self.connection.execute(query, id)
+        async with self._acquire(WRITE) as conn:
+            result = await conn.execute(query, id)
         if result == "DELETE 0":
             raise ValueError(f"Hand with id {id} not found")
\ No newline at end of file
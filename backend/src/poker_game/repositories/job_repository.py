@@ -0,0 +1,136 @@
+from datetime import datetime
+from uuid import UUID, uuid4
+from typing import Any, Dict, Optional
+import asyncpg
+import json
+
+JOB_COLUMNS = """
+    id, kind, status, priority, params, progress, result, error,
+    created_at, started_at, finished_at, heartbeat_at
+"""
+
+# Updates made on behalf of a running job only apply while the caller still holds its
+# lease: the job is running and was claimed at `started_at`, which a requeue clears and
+# the next claim resets. Once the lease is lost they match no row
+LEASE_CONDITION = "id = $1 AND status = 'running' AND started_at = $2"
+
+class JobRepository:
+    def __init__(self, connection: asyncpg.Connection):
+        self.connection = connection
+
+    @staticmethod
+    def _updated(status: str) -> bool:
+        # execute() returns the command tag, e.g. "UPDATE 1"
+        return int(status.split()[-1]) > 0
+
+    @staticmethod
+    def _to_dict(record: asyncpg.Record) -> Dict:
+        return {
+            "id": str(record["id"]),
+            "kind": record["kind"],
+            "status": record["status"],
+            "priority": record["priority"],
+            "params": json.loads(record["params"]) if record["params"] else {},
+            "progress": record["progress"],
+            "result": json.loads(record["result"]) if record["result"] else None,
+            "error": record["error"],
+            "created_at": record["created_at"].isoformat() if record["created_at"] else None,
+            "started_at": record["started_at"].isoformat() if record["started_at"] else None,
+            "finished_at": record["finished_at"].isoformat() if record["finished_at"] else None,
+            "heartbeat_at": record["heartbeat_at"].isoformat() if record["heartbeat_at"] else None
+        }
+
+    async def create(self, kind: str, params: Dict[str, Any], priority: int = 0) -> Dict[str, str]:
+        """Queue a new job and return a dictionary with the job's ID."""
+        query = """
+            INSERT INTO jobs (id, kind, priority, params)
+            VALUES ($1, $2, $3, $4)
+            RETURNING id
+        """
+        result = await self.connection.fetchrow(query, uuid4(), kind, priority, json.dumps(params))
+        if result is None:
+            raise ValueError("Failed to retrieve ID from database after queueing job")
+        return {"id": str(result["id"])}
+
+    async def find_one_by_id(self, id: UUID) -> Optional[Dict]:
+        """Find a job by its ID and return a dictionary."""
+        query = f"SELECT {JOB_COLUMNS} FROM jobs WHERE id = $1"
+        record = await self.connection.fetchrow(query, id)
+        if not record:
+            return None
+        return self._to_dict(record)
+
+    async def claim_next(self) -> Optional[Dict]:
+        """
+        Atomically mark the highest-priority queued job as running, taking its lease,
+        and return it. SKIP LOCKED lets several workers poll the queue without
+        blocking each other.
+        """
+        query = f"""
+            UPDATE jobs SET status = 'running', started_at = CURRENT_TIMESTAMP, heartbeat_at = CURRENT_TIMESTAMP
+            WHERE id = (
+                SELECT id FROM jobs
+                WHERE status = 'queued'
+                ORDER BY priority DESC, created_at
+                LIMIT 1
+                FOR UPDATE SKIP LOCKED
+            )
+            RETURNING {JOB_COLUMNS}
+        """
+        record = await self.connection.fetchrow(query)
+        if not record:
+            return None
+        return self._to_dict(record)
+
+    async def update_progress(
+        self, id: UUID, started_at: datetime, progress: float, partial_result: Optional[Any] = None
+    ) -> bool:
+        """
+        Record progress (0.0 - 1.0) and, optionally, the partial result so far.
+        Returns False if the lease was lost.
+        """
+        query = f"""
+            UPDATE jobs SET progress = $3, result = COALESCE($4::JSONB, result), heartbeat_at = CURRENT_TIMESTAMP
+            WHERE {LEASE_CONDITION}
+        """
+        partial = json.dumps(partial_result) if partial_result is not None else None
+        return self._updated(await self.connection.execute(query, id, started_at, progress, partial))
+
+    async def complete(self, id: UUID, started_at: datetime, result: Any) -> bool:
+        """Mark a job as finished with its final result. Returns False if the lease was lost."""
+        query = f"""
+            UPDATE jobs SET status = 'done', progress = 1, result = $3, finished_at = CURRENT_TIMESTAMP
+            WHERE {LEASE_CONDITION}
+        """
+        return self._updated(await self.connection.execute(query, id, started_at, json.dumps(result)))
+
+    async def fail(self, id: UUID, started_at: datetime, error: str) -> bool:
+        """
+        Mark a job as failed, keeping any partial result already stored. Returns
+        False if the lease was lost.
+        """
+        query = f"""
+            UPDATE jobs SET status = 'failed', error = $3, finished_at = CURRENT_TIMESTAMP
+            WHERE {LEASE_CONDITION}
+        """
+        return self._updated(await self.connection.execute(query, id, started_at, error))
+
+    async def heartbeat(self, id: UUID, started_at: datetime) -> bool:
+        """Renew the lease on a running job. Returns False if it was already lost."""
+        query = f"UPDATE jobs SET heartbeat_at = CURRENT_TIMESTAMP WHERE {LEASE_CONDITION}"
+        return self._updated(await self.connection.execute(query, id, started_at))
+
+    async def requeue_stale(self, lease_timeout: float) -> int:
+        """
+        Put running jobs whose lease expired (no heartbeat for `lease_timeout`
+        seconds, e.g. their process died) back on the queue.
+        """
+        result = await self.connection.execute(
+            """
+            UPDATE jobs SET status = 'queued', started_at = NULL, heartbeat_at = NULL
+            WHERE status = 'running'
+            AND COALESCE(heartbeat_at, started_at) < CURRENT_TIMESTAMP - make_interval(secs => $1)
+            """,
+            lease_timeout
+        )
+        return int(result.split()[-1])
@@ -0,0 +1,22 @@
+# backend/tests/poker_game/repositories/test_hand_archive.py
+from src.poker_game.repositories.hand_archive import read_archive, write_archive
+
+def test_archive_round_trip(tmp_path):
+    hands = [
+        {
+            "id": f"00000000-0000-0000-0000-00000000000{i}",
+            "stacks": "[1000, 1000]",
+            "dealer_position": 0,
+            "small_blind_position": 0,
+            "big_blind_position": 1,
+            "player_cards": '[["As", "Ks"], ["Qh", "Qd"]]',
+            "action_sequence": '[{"type": "fold", "player": "P1"}]',
+            "winnings": '{"P1": -20, "P2": 20}',
+            "created_at": f"2025-01-0{i}T12:00:00+00:00",
+            "variant": "NLHE"
+        }
+        for i in range(1, 4)
+    ]
+    path = str(tmp_path / "2025" / "hands_2025_01.json.gz")
+    write_archive(path, hands)
+    assert read_archive(path) == hands
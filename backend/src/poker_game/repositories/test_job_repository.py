@@ -0,0 +1,91 @@
+# backend/tests/poker_game/repositories/test_job_repository.py
+from datetime import datetime, timezone
+from uuid import uuid4
+import json
+import pytest
+from src.poker_game.repositories.job_repository import JobRepository
+
+def _job_record(**fields):
+    record = {
+        "id": uuid4(),
+        "kind": "audit",
+        "status": "running",
+        "priority": 5,
+        "params": json.dumps({"max_hands": 10}),
+        "progress": 0.0,
+        "result": None,
+        "error": None,
+        "created_at": datetime(2026, 1, 1, tzinfo=timezone.utc),
+        "started_at": datetime(2026, 1, 1, 0, 0, 1, tzinfo=timezone.utc),
+        "finished_at": None,
+        "heartbeat_at": datetime(2026, 1, 1, 0, 0, 1, tzinfo=timezone.utc),
+    }
+    record.update(fields)
+    return record
+
+@pytest.mark.asyncio
+async def test_create_queues_job_with_json_params(fake_pool):
+    record = _job_record()
+    connection = fake_pool(record).connection
+    assert await JobRepository(connection).create("audit", {"max_hands": 10}, priority=5) == {"id": str(record["id"])}
+    query, args = connection.queries[0]
+    assert "INSERT INTO jobs" in query
+    assert args[1:] == ("audit", 5, json.dumps({"max_hands": 10}))
+
+@pytest.mark.asyncio
+async def test_claim_next_takes_lease_on_highest_priority_job(fake_pool):
+    record = _job_record()
+    connection = fake_pool(record).connection
+    job = await JobRepository(connection).claim_next()
+    query, _ = connection.queries[0]
+    assert "FOR UPDATE SKIP LOCKED" in query
+    assert "ORDER BY priority DESC, created_at" in query
+    assert "heartbeat_at = CURRENT_TIMESTAMP" in query
+    assert job["id"] == str(record["id"])
+    assert job["params"] == {"max_hands": 10}
+    assert job["started_at"] == "2026-01-01T00:00:01+00:00"
+    assert job["result"] is None
+
+@pytest.mark.asyncio
+async def test_empty_queue_and_missing_job(fake_pool):
+    repo = JobRepository(fake_pool(None).connection)
+    assert await repo.claim_next() is None
+    assert await repo.find_one_by_id(uuid4()) is None
+
+@pytest.mark.asyncio
+async def test_progress_completion_and_failure_updates(fake_pool):
+    connection = fake_pool("UPDATE 1").connection
+    repo = JobRepository(connection)
+    job_id = uuid4()
+    lease = datetime(2026, 1, 1, 0, 0, 1, tzinfo=timezone.utc)
+    assert await repo.update_progress(job_id, lease, 0.5, {"checked": 500})
+    assert await repo.update_progress(job_id, lease, 0.75)
+    assert await repo.complete(job_id, lease, {"checked": 1000, "invalid": []})
+    assert await repo.fail(job_id, lease, "boom")
+    (progress, progress_args), (_, bare_args), (complete, complete_args), (fail, fail_args) = connection.queries
+    assert "COALESCE($4::JSONB, result)" in progress and "heartbeat_at" in progress
+    assert progress_args == (job_id, lease, 0.5, json.dumps({"checked": 500}))
+    # No partial result keeps the stored one
+    assert bare_args == (job_id, lease, 0.75, None)
+    assert "status = 'done'" in complete and complete_args == (job_id, lease, json.dumps({"checked": 1000, "invalid": []}))
+    assert "status = 'failed'" in fail and fail_args == (job_id, lease, "boom")
+    # Every update is conditional on still holding the lease
+    for query, _ in connection.queries:
+        assert "status = 'running' AND started_at = $2" in query
+
+@pytest.mark.asyncio
+async def test_updates_report_a_lost_lease(fake_pool):
+    repo = JobRepository(fake_pool("UPDATE 0").connection)
+    lease = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    assert not await repo.update_progress(uuid4(), lease, 0.5)
+    assert not await repo.complete(uuid4(), lease, {})
+    assert not await repo.fail(uuid4(), lease, "boom")
+    assert not await repo.heartbeat(uuid4(), lease)
+
+@pytest.mark.asyncio
+async def test_only_jobs_with_an_expired_lease_are_requeued(fake_pool):
+    connection = fake_pool("UPDATE 2").connection
+    assert await JobRepository(connection).requeue_stale(30.0) == 2
+    query, args = connection.queries[0]
+    assert "status = 'running'" in query and "heartbeat_at" in query
+    assert args == (30.0,)
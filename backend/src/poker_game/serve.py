@@ -0,0 +1,183 @@
+# backend/src/poker_game/serve.py
+#
+# Multi-worker launcher:
+#   python -m src.poker_game.serve --workers 4
+#
+# The parent creates an empty rank-table store and imports the app once, then forks
+# the workers, which all serve the same listening socket. Nothing is precomputed: the
+# store is a cache that the range-equity job processes fill as they build tables and
+# read from one another. Database pools are created per worker by the app's lifespan,
+# after the fork; only the first worker runs the job pool. Request profiles are kept
+# in a directory under the shared dir, so any worker can serve them.
+from math import comb
+from typing import Dict, Optional
+import argparse
+import gc
+import logging
+import os
+import shutil
+import signal
+import sys
+import tempfile
+import time
+import uvicorn
+from .api.jobs import JOB_WORKERS_ENABLED_ENV
+from .domain.shared_tables import SHARED_RANK_STORE_ENV, SharedRankTableStore
+from .profiling import PROFILE_STORE, PROFILING_DIR_ENV
+
+# Configure logging
+logging.basicConfig(level=logging.DEBUG)
+logger = logging.getLogger(__name__)
+
+# Entries per rank table: one per two-card combo
+RANK_TABLE_ENTRIES = comb(52, 2)
+
+# Seconds to wait before respawning a worker that exited unexpectedly
+RESPAWN_DELAY = 1.0
+# Workers that fail to start are respawned with exponential backoff up to this delay,
+# and the launcher gives up after this many startup failures in a row
+MAX_RESPAWN_DELAY = 30.0
+MAX_STARTUP_FAILURES = 5
+
+# Exit status of a worker that never started serving (uvicorn uses the same)
+STARTUP_FAILURE_EXIT = 3
+
+def prepare_shared_state(shared_dir: str, rank_store_slots: int) -> str:
+    """
+    Create the (empty) rank-table store and publish its path to the environment, so
+    the processes that run equity jobs attach to it.
+    """
+    path = os.path.join(shared_dir, f"rank-tables-{os.getpid()}.bin")
+    SharedRankTableStore.create(path, rank_store_slots, RANK_TABLE_ENTRIES).close()
+    os.environ[SHARED_RANK_STORE_ENV] = path
+    return path
+
+def prepare_profile_dir(shared_dir: str) -> Optional[str]:
+    """
+    Keep request profiles on disk so any worker can serve a profile another worker
+    recorded. Returns the directory if created here (None if PROFILING_DIR was set).
+    """
+    directory = os.getenv(PROFILING_DIR_ENV)
+    created = None
+    if not directory:
+        directory = created = os.path.join(shared_dir, f"profiles-{os.getpid()}")
+        os.environ[PROFILING_DIR_ENV] = directory
+    PROFILE_STORE.set_directory(directory)
+    return created
+
+def _spawn_worker(server_config: uvicorn.Config, sock, run_jobs: bool = True) -> int:
+    pid = os.fork()
+    if pid == 0:
+        # Child: restore default signal handling for uvicorn and serve until told to stop
+        signal.signal(signal.SIGTERM, signal.SIG_DFL)
+        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        if not run_jobs:
+            os.environ[JOB_WORKERS_ENABLED_ENV] = "0"
+        exit_code = STARTUP_FAILURE_EXIT
+        try:
+            server = uvicorn.Server(server_config)
+            server.run(sockets=[sock])
+            # uvicorn returns without starting when the app's startup fails
+            exit_code = 0 if server.started else STARTUP_FAILURE_EXIT
+        except SystemExit as e:
+            exit_code = e.code if isinstance(e.code, int) else 1
+        except BaseException:
+            logger.exception(f"Worker {os.getpid()} crashed")
+            exit_code = 1
+        finally:
+            logging.shutdown()
+            os._exit(exit_code)
+    logger.info(f"Started worker {pid}")
+    return pid
+
+def serve(host: str, port: int, workers: int, shared_dir: str, rank_store_slots: int) -> int:
+    """Run the workers until told to stop; returns the launcher's exit status."""
+    if workers < 1:
+        raise ValueError("At least one worker is required")
+    store_path = prepare_shared_state(shared_dir, rank_store_slots)
+    profile_dir = prepare_profile_dir(shared_dir)
+    try:
+        # Import the app once here rather than in every worker
+        from main import app
+        # Move everything allocated so far out of the collector's reach, so collections
+        # in the workers don't touch (and un-share) the parent's pages
+        gc.collect()
+        gc.freeze()
+
+        server_config = uvicorn.Config(app, host=host, port=port)
+        sock = server_config.bind_socket()
+        children: Dict[int, int] = {}
+        stopping = False
+        startup_failures = 0
+        exit_status = 0
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+            for pid in list(children):
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+
+        def pause(seconds: float) -> None:
+            # Sleep in short steps so a stop signal isn't held up by a respawn backoff
+            deadline = time.monotonic() + seconds
+            while not stopping and time.monotonic() < deadline:
+                time.sleep(min(0.1, deadline - time.monotonic()))
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        # Slot 0 runs the job pool (and takes it over again when respawned)
+        for slot in range(workers):
+            children[_spawn_worker(server_config, sock, slot == 0)] = slot
+
+        while children:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            except InterruptedError:
+                continue
+            slot = children.pop(pid, None)
+            if slot is None or stopping:
+                continue
+            exit_code = os.waitstatus_to_exitcode(status)
+            if exit_code != STARTUP_FAILURE_EXIT:
+                startup_failures = 0
+                logger.warning(f"Worker {pid} exited with status {exit_code}, respawning")
+                pause(RESPAWN_DELAY)
+            else:
+                startup_failures += 1
+                if startup_failures >= MAX_STARTUP_FAILURES:
+                    logger.error(f"Workers failed to start {startup_failures} times in a row, shutting down")
+                    exit_status = 1
+                    stop(None, None)
+                    continue
+                delay = min(RESPAWN_DELAY * 2 ** startup_failures, MAX_RESPAWN_DELAY)
+                logger.warning(f"Worker {pid} failed to start, respawning in {delay:.0f}s")
+                pause(delay)
+            # A stop signal during the pause must not start a worker it can no longer reach
+            if stopping:
+                continue
+            children[_spawn_worker(server_config, sock, slot == 0)] = slot
+        sock.close()
+        return exit_status
+    finally:
+        try:
+            os.remove(store_path)
+        except OSError:
+            pass
+        if profile_dir is not None:
+            shutil.rmtree(profile_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the API with several worker processes")
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1))))
+    parser.add_argument("--shared-dir", default=os.getenv("POKER_SHARED_DIR", tempfile.gettempdir()))
+    parser.add_argument("--rank-store-slots", type=int, default=int(os.getenv("RANK_STORE_SLOTS", "8192")))
+    args = parser.parse_args()
+    sys.exit(serve(args.host, args.port, args.workers, args.shared_dir, args.rank_store_slots))
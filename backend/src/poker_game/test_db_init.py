@@ -0,0 +1,14 @@
+# backend/tests/poker_game/test_db_init.py
+import pytest
+from src.poker_game.db_init import MIGRATION_LOCK_KEY, migration_lock
+
+@pytest.mark.asyncio
+async def test_migration_lock_is_released_on_failure(fake_pool):
+    connection = fake_pool().connection
+    with pytest.raises(RuntimeError):
+        async with migration_lock(connection):
+            raise RuntimeError("migration failed")
+    assert connection.queries == [
+        ("SELECT pg_advisory_lock($1)", (MIGRATION_LOCK_KEY,)),
+        ("SELECT pg_advisory_unlock($1)", (MIGRATION_LOCK_KEY,)),
+    ]
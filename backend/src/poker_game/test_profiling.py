@@ -0,0 +1,127 @@
+# backend/tests/poker_game/test_profiling.py
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+import marshal
+from src.poker_game import profiling
+from src.poker_game.api.debug import router as debug_router, profiling_middleware
+from src.poker_game.profiling import (
+    MODE_CPROFILE, MODE_STAGES, PROFILE_STORE, ProfileStore, current_profile, mark_stage,
+    profile_stage, should_profile, start_profile
+)
+
+def test_stages_are_recorded_only_inside_a_profile():
+    with profile_stage("db"):
+        pass
+    assert current_profile() is None
+
+    with start_profile("unit", MODE_STAGES) as profile:
+        with profile_stage("db"):
+            sum(range(1000))
+        with profile_stage("db"):
+            pass
+        mark_stage("handler")
+    assert current_profile() is None
+    assert set(profile.stages) == {"db", "handler"}
+    report = PROFILE_STORE.get(profile.id).report()
+    assert report["total_ms"] >= report["stages_ms"]["db"]
+    assert report["stats"] is None
+
+def _outside_stage():
+    return sorted(range(10))
+
+def test_cprofile_captures_stage_sections_one_at_a_time():
+    with start_profile("outer") as outer:
+        # Code outside a stage section is not captured
+        _outside_stage()
+        with profile_stage("evaluation"):
+            with start_profile("inner") as inner:
+                with profile_stage("evaluation"):
+                    sorted(range(1000), reverse=True)
+    assert outer.mode == inner.mode == MODE_CPROFILE
+    assert "sorted" in outer.stats_text()
+    assert "_outside_stage" not in outer.stats_text()
+    assert isinstance(marshal.loads(outer.pstats_bytes()), dict)
+    # The inner section ran while the outer capture was active, so it is timed only
+    assert inner.stats_text() is None
+    assert inner.report()["skipped_sections"] == 1
+    assert "evaluation" in inner.stages
+
+def test_marks_do_not_recount_stage_sections():
+    with start_profile("unit", MODE_STAGES) as profile:
+        with profile_stage("replay"):
+            sum(range(100000))
+        mark_stage("serialization")
+    assert profile.stages["serialization"] < profile.stages["replay"]
+
+def test_store_is_bounded():
+    store = ProfileStore(maxsize=2)
+    profiles = [profiling.RequestProfile(f"p{i}", MODE_STAGES) for i in range(3)]
+    for profile in profiles:
+        store.add(profile)
+    assert store.get(profiles[0].id) is None
+    assert store.get(profiles[2].id) is profiles[2]
+
+def test_directory_store_is_shared_between_instances(tmp_path):
+    # Two stores on one directory stand in for two worker processes
+    writer, reader = ProfileStore(maxsize=2, directory=str(tmp_path)), ProfileStore(directory=str(tmp_path))
+    with start_profile("captured") as captured:
+        with profile_stage("evaluation"):
+            sorted(range(1000), reverse=True)
+    writer.add(captured)
+    loaded = reader.get(captured.id)
+    assert loaded.report()["stages_ms"] == captured.report()["stages_ms"]
+    assert "sorted" in loaded.stats_text()
+    assert marshal.loads(loaded.pstats_bytes()) == marshal.loads(captured.pstats_bytes())
+
+    timed = [profiling.RequestProfile(f"p{i}", MODE_STAGES) for i in range(2)]
+    for profile in timed:
+        profile.finish()
+        writer.add(profile)
+    assert reader.get(timed[1].id).stats_text() is None
+    # Bounded: the oldest profile's files are gone
+    assert reader.get(captured.id) is None
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted(f"{profile.id}.json" for profile in timed)
+    assert reader.get("../etc/passwd") is None
+
+def test_should_profile_honours_switch_and_sample_rate(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", False)
+    assert should_profile("1") is None
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILING_SAMPLE_RATE", 1.0)
+    assert should_profile(None) is None
+    assert should_profile("0") is None
+    assert should_profile("1") == MODE_CPROFILE
+    assert should_profile("stages") == MODE_STAGES
+    monkeypatch.setattr(profiling, "PROFILING_SAMPLE_RATE", 0.0)
+    assert should_profile("1") is None
+
+def test_flagged_request_is_profiled_and_downloadable(monkeypatch):
+    monkeypatch.setattr(profiling, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(profiling, "PROFILING_SAMPLE_RATE", 1.0)
+    app = FastAPI()
+    app.middleware("http")(profiling_middleware)
+    app.include_router(debug_router)
+
+    @app.get("/hands/")
+    async def list_hands():
+        mark_stage("validation")
+        with profile_stage("db"):
+            hands = [{"id": i} for i in range(10)]
+        return hands
+
+    client = TestClient(app)
+    assert "X-Profile-Id" not in client.get("/hands/").headers
+
+    response = client.get("/hands/", headers={"X-Profile": "1"})
+    profile_id = response.headers["X-Profile-Id"]
+    report = client.get(f"/debug/profiles/{profile_id}").json()
+    assert {"validation", "db", "serialization"} <= set(report["stages_ms"])
+    assert report["mode"] == MODE_CPROFILE
+
+    response = client.get(f"/debug/profiles/{profile_id}", params={"format": "pstats"})
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert isinstance(marshal.loads(response.content), dict)
+
+    profile_id = client.get("/hands/", params={"profile": "stages"}).headers["X-Profile-Id"]
+    assert client.get(f"/debug/profiles/{profile_id}", params={"format": "pstats"}).status_code == 404
+    assert client.get("/debug/profiles/missing").status_code == 404
@@ -0,0 +1,70 @@
+# backend/tests/poker_game/test_serve.py
+from contextlib import asynccontextmanager
+import os
+import signal
+import subprocess
+import sys
+import time
+import uvicorn
+from fastapi import FastAPI
+from src.poker_game.api.jobs import JOB_WORKERS_ENABLED_ENV
+from src.poker_game.serve import STARTUP_FAILURE_EXIT, _spawn_worker
+
+@asynccontextmanager
+async def failing_lifespan(app: FastAPI):
+    raise ValueError("DATABASE_URL environment variable not set")
+    yield
+
+def test_worker_that_fails_to_start_exits_non_zero():
+    config = uvicorn.Config(FastAPI(lifespan=failing_lifespan), host="127.0.0.1", port=0, lifespan="on")
+    sock = config.bind_socket()
+    try:
+        pid = _spawn_worker(config, sock)
+        _, status = os.waitpid(pid, 0)
+    finally:
+        sock.close()
+    assert os.waitstatus_to_exitcode(status) == STARTUP_FAILURE_EXIT
+
+def test_only_workers_given_the_job_pool_run_it(tmp_path):
+    @asynccontextmanager
+    async def recording_lifespan(app: FastAPI):
+        (tmp_path / str(os.getpid())).write_text(os.getenv(JOB_WORKERS_ENABLED_ENV, "1"))
+        raise ValueError("stop after recording")
+        yield
+
+    config = uvicorn.Config(FastAPI(lifespan=recording_lifespan), host="127.0.0.1", port=0, lifespan="on")
+    sock = config.bind_socket()
+    try:
+        pids = {run_jobs: _spawn_worker(config, sock, run_jobs) for run_jobs in (True, False)}
+        for pid in pids.values():
+            os.waitpid(pid, 0)
+    finally:
+        sock.close()
+    assert (tmp_path / str(pids[True])).read_text() == "1"
+    assert (tmp_path / str(pids[False])).read_text() == "0"
+
+# Serves main's app, whose workers fail to start without DATABASE_URL, with a long backoff
+LAUNCHER = """
+import sys
+from src.poker_game import serve
+serve.RESPAWN_DELAY = 60.0
+sys.exit(serve.serve("127.0.0.1", 0, 1, sys.argv[1], 4))
+"""
+
+def test_stop_signal_during_backoff_ends_the_launcher(tmp_path):
+    env = {key: value for key, value in os.environ.items() if key != "DATABASE_URL"}
+    launcher = subprocess.Popen(
+        [sys.executable, "-c", LAUNCHER, str(tmp_path)], env=env, stderr=subprocess.PIPE, text=True
+    )
+    try:
+        for line in launcher.stderr:
+            if "failed to start, respawning" in line:
+                break
+        started = time.monotonic()
+        launcher.send_signal(signal.SIGTERM)
+        _, output = launcher.communicate(timeout=10)
+    finally:
+        launcher.kill()
+    assert launcher.returncode == 0
+    assert time.monotonic() - started < 5
+    assert "Started worker" not in output